@@ -3,27 +3,57 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import config
 from models import db, migrate
+# Only the NumPy service behind the classification routes loads lazily; the table must
+# still be registered for create_all and migration autogenerate
+from models.classification import ProductClassification  # noqa: F401
+from commands import register_commands
+from services.cache import init_cache
+from services.logs import init_logging
+from services.database import configure_engine, dispose_engines_after_fork
+from services.json_provider import init_json
+from services.compression import compress_response
+from services.querystats import init_query_stats
+from services.metrics import init_metrics
+from services.tokens import is_revoked
+from services.throttle import init_throttle
 from routes.auth import auth_bp
 from routes.products import products_bp
 from routes.inventory import inventory_bp
 from routes.sales import sales_bp
 from routes.categories import categories_bp
+from routes.dashboard import dashboard_bp
+from routes.events import events_bp
+from routes.jobs import jobs_bp
+import logging
+
+logger = logging.getLogger(__name__)
 
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    init_logging(app)
+    init_json(app)
     
     # CORS configuration
     CORS(app)
     app.after_request(add_cors_headers)
+    app.after_request(compress_response)
     
     # Disable strict slashes
     app.url_map.strict_slashes = False
     
     # Initialize extensions
+    configure_engine(app)
     db.init_app(app)
+    dispose_engines_after_fork(app)
     migrate.init_app(app, db)
-    JWTManager(app)
+    jwt = JWTManager(app)
+    jwt.token_in_blocklist_loader(lambda jwt_header, jwt_payload: is_revoked(jwt_payload))
+    register_commands(app)
+    init_cache(app)
+    init_throttle(app)
+    init_query_stats(app)
+    init_metrics(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -31,6 +61,9 @@ def create_app(config_name='default'):
     app.register_blueprint(inventory_bp, url_prefix='/api/inventory')
     app.register_blueprint(sales_bp, url_prefix='/api/sales')
     app.register_blueprint(categories_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
     
     @app.route('/')
     def home():
@@ -43,7 +76,7 @@ def create_app(config_name='default'):
     
     @app.route('/test-cors', methods=['GET', 'POST', 'OPTIONS'])
     def test_cors():
-        print(f"Test CORS - Method: {request.method}")
+        logger.debug("Test CORS - Method: %s", request.method)
         return jsonify({"message": "CORS test working", "method": request.method})
     
     return app
@@ -0,0 +1,101 @@
+"""
+Encode time and payload size of a catalog-sized JSON response: stdlib vs
+orjson provider, then identity vs gzip vs brotli.
+
+    python benchmarks/json_compression.py [--products 20000] [--repeat 5]
+"""
+import argparse
+import gzip
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from services.json_provider import OrjsonProvider, orjson  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def catalog(count):
+    """Product.to_dict()-shaped rows, as served by GET /api/products"""
+    rng = random.Random(42)
+    brands = ['Nike', 'Adidas', 'Puma', 'Bata', 'Vans', 'Converse', 'Reebok', 'New Balance']
+    categories = ['Running', 'Sneakers', 'Formal', 'Sandals', 'Boots', 'School']
+    created = datetime(2024, 1, 1)
+    products = []
+    for i in range(count):
+        brand = rng.choice(brands)
+        purchase = round(rng.uniform(800, 6000), 2)
+        products.append({
+            'id': i + 1,
+            'sku': f'{brand[:2].upper()}-{i:06d}',
+            'name': f'{brand} {rng.choice(categories)} {rng.randint(1, 99)}',
+            'brand': brand,
+            'category': rng.choice(categories),
+            'size': str(rng.randint(36, 46)),
+            'color': rng.choice(['Black', 'White', 'Red', 'Blue', 'Brown']),
+            'supplier': f'Supplier {rng.randint(1, 40)}',
+            'purchase_price': purchase,
+            'retail_price': round(purchase * 1.6, 2),
+            'wholesale_price': round(purchase * 1.3, 2),
+            'current_stock': rng.randint(0, 200),
+            'created_at': (created + timedelta(minutes=i)).isoformat()
+        })
+    return {'success': True, 'products': products, 'count': count}
+
+
+def timed(function, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask('benchmark')
+    payload = catalog(args.products)
+    providers = [('stdlib', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    else:
+        print('orjson not installed; stdlib only')
+
+    print(f'Catalog of {args.products} products, best of {args.repeat}\n')
+    print(f"{'encoder':<10}{'encode ms':>12}{'bytes':>14}")
+    body = None
+    with app.app_context():
+        for name, provider in providers:
+            elapsed, response = timed(lambda: provider.response(payload), args.repeat)
+            body = response.get_data()
+            print(f'{name:<10}{elapsed:>12.1f}{len(body):>14,}')
+
+    encodings = [('identity', lambda data: data)]
+    encodings += [(f'gzip-{level}', lambda data, level=level: gzip.compress(data, compresslevel=level)) for level in (1, 5, 6)]
+    if brotli is not None:
+        encodings += [(f'br-{quality}', lambda data, quality=quality: brotli.compress(data, quality=quality)) for quality in (4, 6)]
+    else:
+        print('\nbrotli not installed; gzip only')
+
+    print(f"\n{'encoding':<10}{'compress ms':>12}{'bytes':>14}{'ratio':>8}")
+    for name, compress in encodings:
+        elapsed, compressed = timed(lambda: compress(body), args.repeat)
+        print(f'{name:<10}{elapsed:>12.1f}{len(compressed):>14,}{len(body) / len(compressed):>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
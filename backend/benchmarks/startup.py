@@ -0,0 +1,128 @@
+"""
+Cold start of the production server: time from launching gunicorn to the
+first served request, with and without --preload, plus the memory the
+master and workers hold once up.
+
+    python benchmarks/startup.py [--runs 3] [--workers 4] [--max-seconds 10]
+
+With --max-seconds the script exits non-zero when the median time to the
+first request of any mode is over budget (CI runs it that way).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PRELOAD_MODES = {'per-worker': 'false', 'preload': 'true'}
+
+
+def import_seconds():
+    """Time to import the WSGI module (create_app included) in a fresh interpreter"""
+    code = 'import time; started = time.perf_counter(); import wsgi; print(time.perf_counter() - started)'
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def pss_kib(pid):
+    """Proportional set size: shared copy-on-write pages count once across processes"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            for line in rollup:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def process_tree(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            return [pid] + [int(child) for child in children.read().split()]
+    except OSError:
+        return [pid]
+
+
+def first_request(url, process, timeout):
+    """Seconds until `url` answers 200, or None if the server exits or never answers"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            return None
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            time.sleep(0.02)
+    return None
+
+
+def cold_start(preload, workers, port, timeout):
+    env = dict(
+        os.environ, GUNICORN_PRELOAD=preload, GUNICORN_BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(workers)
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        elapsed = first_request(f'http://127.0.0.1:{port}/', process, timeout)
+        # Let every worker finish booting before measuring memory
+        time.sleep(1)
+        sizes = [pss_kib(pid) for pid in process_tree(process.pid)]
+        memory = sum(sizes) if sizes and None not in sizes else None
+        return elapsed, memory
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--timeout', type=float, default=60, help='seconds to wait for the first response')
+    parser.add_argument('--max-seconds', type=float, help='fail when a median time to first request exceeds this')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'smartshoe-startup.db')}")
+    os.environ.update({'LOG_LEVEL': 'WARNING', 'LOG_REQUESTS': 'false', 'LOGIN_THROTTLE_BACKEND': 'none'})
+    os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    print(f"import wsgi (create_app): median {statistics.median(imports) * 1000:.0f} ms over {args.runs} runs\n")
+
+    print(f"{args.workers} {os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')} workers, {args.runs} runs per mode")
+    print(f"{'mode':<12}{'first request s':>17}{'max s':>8}{'PSS MiB':>10}")
+    failed = []
+    for mode, preload in PRELOAD_MODES.items():
+        runs = [cold_start(preload, args.workers, args.port, args.timeout) for _ in range(args.runs)]
+        times = [elapsed for elapsed, _ in runs]
+        if None in times:
+            print(f'{mode:<12}  server did not answer within {args.timeout:.0f}s')
+            failed.append(mode)
+            continue
+        memory = [kib for _, kib in runs if kib is not None]
+        median = statistics.median(times)
+        print(
+            f"{mode:<12}{median:>17.2f}{max(times):>8.2f}"
+            f"{(statistics.median(memory) / 1024 if memory else float('nan')):>10.1f}"
+        )
+        if args.max_seconds is not None and median > args.max_seconds:
+            failed.append(mode)
+
+    if failed:
+        print(f"\nStartup failed or over budget: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
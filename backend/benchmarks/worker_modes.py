@@ -0,0 +1,302 @@
+"""
+Throughput of gunicorn sync vs gthread vs gevent workers under a mixed load
+of checkouts (POST /api/sales) and uncached analytics reads.
+
+    python benchmarks/worker_modes.py --seed            # sqlite file in /tmp
+    DATABASE_URL=postgresql://... python benchmarks/worker_modes.py --seed
+    python benchmarks/worker_modes.py --streams 8       # with 8 idle SSE clients open
+    python benchmarks/worker_modes.py --check-sessions  # session scoping only
+
+Each mode runs gunicorn with gunicorn.conf.py, so the numbers reflect the
+production settings; only the worker class (and threads) change between runs.
+Waiting on the database is what threads and greenlets overlap, so run it
+against Postgres for decisions; on sqlite every query holds the GIL.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+REPORT_URLS = [
+    '/api/sales/analytics/product-performance?limit=50',
+    '/api/sales/analytics/monthly-trend?months=12',
+    '/api/sales/analytics/heatmap',
+    '/api/dashboard',
+    '/api/inventory/reorder-suggestions'
+]
+# A request still waiting after this counts as an error (e.g. every worker held by a stream)
+REQUEST_TIMEOUT = 10
+MODES = {
+    'sync': {'GUNICORN_WORKER_CLASS': 'sync'},
+    'gthread': {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': '8'},
+    'gevent': {'GUNICORN_WORKER_CLASS': 'gevent'}
+}
+
+
+def seed(products=300, sales=20000, days=180):
+    """Tables plus a catalog with deep stock and `sales` past sales; returns product ids"""
+    from app import create_app
+    from models import db
+    from models.inventory import InventoryItem
+    from models.product import Product
+    from models.sale import Sale, SaleItem
+    from services.rollup import rebuild_rollup
+
+    app = create_app('production')
+    rng = random.Random(7)
+    with app.app_context():
+        db.create_all()
+        existing = [row.id for row in Product.query.filter(Product.sku.like('BENCH-%')).all()]
+        if existing:
+            return existing
+
+        catalog = [
+            Product(
+                name=f'Bench shoe {i}', brand=rng.choice(['Nike', 'Adidas', 'Puma', 'Bata']),
+                category=rng.choice(['Running', 'Sneakers', 'Formal']), size=str(36 + i % 10),
+                color='Black', purchase_price=1000.0, retail_price=1600.0, wholesale_price=1300.0,
+                sku=f'BENCH-{i:05d}'
+            )
+            for i in range(products)
+        ]
+        db.session.add_all(catalog)
+        db.session.flush()
+        db.session.add_all(
+            InventoryItem(product_id=product.id, transaction_type='in', quantity=1_000_000) for product in catalog
+        )
+
+        now = datetime.utcnow()
+        for i in range(sales):
+            product = rng.choice(catalog)
+            quantity = rng.randint(1, 3)
+            sale = Sale(
+                invoice_number=f'BENCH-{i:07d}', sale_type='retail', total_amount=quantity * 1600.0,
+                created_at=now - timedelta(minutes=rng.randint(0, days * 24 * 60))
+            )
+            sale.items.append(SaleItem(
+                product_id=product.id, quantity=quantity, unit_price=1600.0, unit_cost=1000.0,
+                product_name=product.name, product_brand=product.brand, product_category=product.category
+            ))
+            db.session.add(sale)
+            if i % 2000 == 1999:
+                db.session.flush()
+        db.session.commit()
+        rebuild_rollup()
+        db.session.commit()
+        return [product.id for product in catalog]
+
+
+def access_token():
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+    from services.roles import role_claims
+
+    app = create_app('production')
+    with app.app_context():
+        return create_access_token(identity=1, additional_claims=role_claims('admin'))
+
+
+def check_session_scoping(mode, workers=8):
+    """
+    Concurrent request contexts must each get their own session and connection.
+    Every request holds its connection until all have one, so `workers` must
+    fit in the pool (pool_size + max_overflow).
+    """
+    if mode == 'gevent':
+        try:
+            from gevent import monkey
+        except ImportError:
+            print('gevent: not installed, skipped')
+            return True
+        monkey.patch_all()
+    from flask import g
+    from app import create_app
+    from models import db
+
+    app = create_app('production')
+    barrier = threading.Barrier(workers)
+    seen = []
+
+    def request_context():
+        with app.test_request_context('/'):
+            session = db.session()
+            session.execute(db.text('SELECT 1'))
+            connection = session.connection().connection.dbapi_connection
+            barrier.wait(timeout=10)
+            seen.append((id(session), id(connection), id(g._get_current_object())))
+
+    threads = [threading.Thread(target=request_context) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sessions, connections, contexts = (len({row[i] for row in seen}) for i in range(3))
+    ok = len(seen) == workers and sessions == connections == contexts == workers
+    print(f'{mode}: {workers} concurrent requests -> {sessions} sessions, {connections} connections, '
+          f'{contexts} g objects: {"OK" if ok else "SHARED"}')
+    return ok
+
+
+def open_streams(base_url, token, count):
+    """Hold `count` /api/events streams open, like tills with the dashboard up; returns a close function"""
+    import requests
+
+    stop = threading.Event()
+    responses = []
+
+    def listen():
+        try:
+            response = requests.get(f'{base_url}/api/events?jwt={token}', stream=True, timeout=(5, None))
+            responses.append(response)
+            for _ in response.iter_lines():
+                if stop.is_set():
+                    break
+        except (requests.RequestException, AttributeError, OSError):
+            pass  # close() shut the connection under the reader
+
+    threads = [threading.Thread(target=listen, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    time.sleep(1)
+
+    def close():
+        stop.set()
+        for response in responses:
+            response.close()
+
+    return close
+
+
+def run_load(base_url, token, product_ids, seconds, clients, report_share):
+    import requests
+
+    results = {'checkout': [], 'report': []}
+    errors = {'checkout': 0, 'report': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(number):
+        rng = random.Random(number)
+        http = requests.Session()
+        http.headers['Authorization'] = f'Bearer {token}'
+        while time.perf_counter() < deadline:
+            kind = 'report' if rng.random() < report_share else 'checkout'
+            started = time.perf_counter()
+            try:
+                if kind == 'report':
+                    response = http.get(base_url + rng.choice(REPORT_URLS), timeout=REQUEST_TIMEOUT)
+                else:
+                    response = http.post(base_url + '/api/sales/', timeout=REQUEST_TIMEOUT, json={
+                        'sale_type': 'retail',
+                        'items': [{'product_id': rng.choice(product_ids), 'quantity': 1, 'unit_price': 1600}]
+                    })
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                if ok:
+                    results[kind].append(elapsed)
+                else:
+                    errors[kind] += 1
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def wait_until_up(base_url, process, timeout=30):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            requests.get(base_url + '/', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start')
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', default='sync,gthread,gevent')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes per mode')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent load-generating clients')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--report-share', type=float, default=0.2, help='fraction of requests that are reports')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--streams', type=int, default=0, help='idle SSE streams held open during the load')
+    parser.add_argument('--seed', action='store_true', help='create tables and benchmark data first')
+    parser.add_argument('--check-sessions', nargs='?', const='all', help='only verify session scoping (thread, gevent or all)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'smartshoe-bench.db')}")
+    os.environ.update({
+        'LOG_LEVEL': 'WARNING', 'LOG_REQUESTS': 'false', 'ANALYTICS_CACHE_BACKEND': 'none',
+        'LOGIN_THROTTLE_BACKEND': 'none', 'WEB_CONCURRENCY': str(args.workers)
+    })
+
+    if args.check_sessions:
+        if args.check_sessions in ('thread', 'gevent'):
+            sys.exit(0 if check_session_scoping(args.check_sessions) else 1)
+        # gevent must patch before anything is imported, so each check gets its own process
+        failed = [
+            mode for mode in ('thread', 'gevent')
+            if subprocess.call([sys.executable, __file__, '--check-sessions', mode], cwd=BACKEND_DIR)
+        ]
+        sys.exit(1 if failed else 0)
+
+    product_ids = seed() if args.seed else list(range(1, 301))
+    token = access_token()
+    base_url = f'http://127.0.0.1:{args.port}'
+
+    print(f"{args.workers} workers, {args.clients} clients, {args.seconds:.0f}s per mode, "
+          f"{args.report_share:.0%} reports, {args.streams} open streams, {os.environ['DATABASE_URL'].split('://')[0]}\n")
+    print(f"{'mode':<9}{'req/s':>8}{'checkout/s':>12}{'p50 ms':>9}{'p95 ms':>9}{'report/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'errors':>8}")
+    for mode in args.modes.split(','):
+        env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{args.port}', **MODES[mode])
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_up(base_url, process)
+            close_streams = open_streams(base_url, token, args.streams)
+            try:
+                results, errors = run_load(base_url, token, product_ids, args.seconds, args.clients, args.report_share)
+            finally:
+                close_streams()
+        finally:
+            process.terminate()
+            process.wait()
+
+        checkouts, reports = results['checkout'], results['report']
+        print(
+            f"{mode:<9}{(len(checkouts) + len(reports)) / args.seconds:>8.1f}"
+            f"{len(checkouts) / args.seconds:>12.1f}{percentile(checkouts, 0.5):>9.0f}{percentile(checkouts, 0.95):>9.0f}"
+            f"{len(reports) / args.seconds:>10.1f}{percentile(reports, 0.5):>9.0f}{percentile(reports, 0.95):>9.0f}"
+            f"{sum(errors.values()):>8}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,8 @@ from models.user import User
 from models.product import Product
 from models.inventory import InventoryItem
 from models.sale import Sale, SaleItem
+from models.rollup import SalesDailyRollup, SalesHourlyRollup
+from models.classification import ProductClassification
 from models.category import Category
 from models.brand import Brand
 
@@ -23,6 +25,8 @@ def clear_all_data():
     try:
         # Delete in correct order (relationships matter)
         print("📦 Clearing sales data...")
+        SalesDailyRollup.query.delete()
+        SalesHourlyRollup.query.delete()
         SaleItem.query.delete()
         Sale.query.delete()
         
@@ -30,6 +34,7 @@ def clear_all_data():
         InventoryItem.query.delete()
         
         print("📦 Clearing products...")
+        ProductClassification.query.delete()
         Product.query.delete()
         
         print("📦 Clearing categories...")
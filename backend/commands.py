@@ -0,0 +1,186 @@
+import click
+from sqlalchemy import inspect
+from models import db
+
+
+def add_missing_columns(model):
+    """ALTER TABLE ... ADD COLUMN for model columns an existing table lacks"""
+    engine = db.engine
+    table = model.__table__
+    existing = {column['name'] for column in inspect(engine).get_columns(table.name)}
+    added = []
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            connection.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added.append(column.name)
+    return added
+
+
+def register_commands(app):
+    """Attach the SmartShoe maintenance commands to `flask`"""
+
+    @app.cli.command('create-indexes')
+    def create_indexes():
+        """Create any model indexes missing from an existing database"""
+        engine = db.engine
+        inspector = inspect(engine)
+        created = 0
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            for index in table.indexes:
+                if inspector.has_index(table.name, index.name):
+                    continue
+                index.create(bind=engine)
+                created += 1
+                click.echo(f"✅ Created index {index.name} on {table.name}")
+        click.echo(f"Done ({created} index(es) created)")
+
+    @app.cli.command('rebuild-rollup')
+    def rebuild_rollup_command():
+        """Recompute the sales_daily_rollup table from sale history"""
+        from services.rollup import rebuild_rollup
+
+        rows = rebuild_rollup()
+        click.echo(f"✅ Rebuilt sales_daily_rollup ({rows} rows)")
+
+    @app.cli.command('backfill-sale-snapshots')
+    def backfill_sale_snapshots():
+        """Add and fill sale_items cost/name/brand/category snapshots, then rebuild the rollup"""
+        from models.product import Product
+        from models.rollup import SalesDailyRollup
+        from models.sale import SaleItem
+        from services.rollup import rebuild_rollup
+
+        for model in (SaleItem, SalesDailyRollup):
+            for column in add_missing_columns(model):
+                click.echo(f"✅ Added {model.__tablename__}.{column}")
+
+        # Historical rows take the product's current values, the best record available
+        snapshots = {
+            'unit_cost': Product.purchase_price,
+            'product_name': Product.name,
+            'product_brand': Product.brand,
+            'product_category': Product.category
+        }
+        for column, source in snapshots.items():
+            result = db.session.execute(
+                db.update(SaleItem).where(getattr(SaleItem, column).is_(None)).values({
+                    column: db.select(source).where(Product.id == SaleItem.product_id).scalar_subquery()
+                })
+            )
+            click.echo(f"✅ Filled sale_items.{column} on {result.rowcount} row(s)")
+        db.session.commit()
+
+        rows = rebuild_rollup()
+        click.echo(f"✅ Rebuilt sales_daily_rollup ({rows} rows)")
+
+    @app.cli.command('backfill-business-dates')
+    @click.option('--batch-size', default=5000, show_default=True)
+    def backfill_business_dates(batch_size):
+        """Add and fill sales/inventory_items business_date, index it, then rebuild the rollup"""
+        from models.inventory import InventoryItem
+        from models.sale import Sale
+        from services.clock import business_date_for
+        from services.rollup import rebuild_rollup
+
+        for model in (Sale, InventoryItem):
+            for column in add_missing_columns(model):
+                click.echo(f"✅ Added {model.__tablename__}.{column}")
+
+            filled = 0
+            while True:
+                rows = db.session.query(model.id, model.created_at).filter(
+                    model.business_date.is_(None), model.created_at.isnot(None)
+                ).limit(batch_size).all()
+                if not rows:
+                    break
+                db.session.execute(db.update(model), [
+                    {'id': row.id, 'business_date': business_date_for(row.created_at)} for row in rows
+                ])
+                db.session.commit()
+                filled += len(rows)
+            click.echo(f"✅ Filled {model.__tablename__}.business_date on {filled} row(s)")
+
+            inspector = inspect(db.engine)
+            for index in model.__table__.indexes:
+                if not inspector.has_index(model.__tablename__, index.name):
+                    index.create(bind=db.engine)
+                    click.echo(f"✅ Created index {index.name}")
+
+        rows = rebuild_rollup()
+        click.echo(f"✅ Rebuilt sales_daily_rollup ({rows} rows)")
+
+    @app.cli.command('classify-products')
+    @click.option('--weeks', default=13, show_default=True, help='Weeks of sales history to classify on')
+    def classify_products(weeks):
+        """Recompute the ABC/XYZ product_classifications table"""
+        from services.cache import bump_data_version
+        from services.classification import refresh_classifications
+
+        rows = refresh_classifications(weeks)
+        bump_data_version()
+        click.echo(f"✅ Classified {rows} products")
+
+    @app.cli.command('run-jobs')
+    @click.option('--workers', type=int, default=None, help='Worker processes (default JOBS_WORKERS)')
+    def run_jobs(workers):
+        """Run queued background jobs in a pool of worker processes until interrupted"""
+        import multiprocessing
+        import signal
+        from services.jobs import requeue_interrupted, work
+
+        workers = workers or app.config['JOBS_WORKERS']
+        requeued = requeue_interrupted()
+        if requeued:
+            click.echo(f"↩️  Requeued {requeued} interrupted job(s)")
+        db.session.remove()
+        db.engine.dispose()
+
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=work, args=(app, app.config['JOBS_POLL_SECONDS']), name=f'jobs-{i}')
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        click.echo(f"🚀 Running jobs with {workers} worker process(es)")
+
+        def stop(*args):
+            # Workers finish their current job, then exit
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for process in processes:
+            process.join()
+        click.echo("Job workers stopped")
+
+    @app.cli.command('set-role')
+    @click.argument('username')
+    @click.argument('role')
+    def set_role(username, role):
+        """Give USERNAME the ROLE (e.g. the first admin; self-registration always creates staff)"""
+        from models.user import User
+        from services.roles import ROLE_PERMISSIONS
+
+        if role not in ROLE_PERMISSIONS:
+            raise click.BadParameter(f"expected one of {', '.join(ROLE_PERMISSIONS)}", param_hint='ROLE')
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.ClickException(f"No user named {username}")
+        user.set_role(role)
+        db.session.commit()
+        click.echo(f"✅ {username} is now {role} (from their next login)")
+
+    @app.cli.command('prune-revoked-tokens')
+    def prune_revoked_tokens():
+        """Delete revoked_tokens rows whose tokens have expired anyway"""
+        from services.tokens import prune_expired
+
+        click.echo(f"✅ Pruned {prune_expired()} expired revocation(s)")
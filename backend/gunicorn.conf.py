@@ -0,0 +1,58 @@
+# Gunicorn settings, driven by the environment; command-line flags take precedence.
+#
+#   GUNICORN_WORKER_CLASS  gevent (default), gthread or sync
+#   WEB_CONCURRENCY        worker processes (also sizes the database pools)
+#   GUNICORN_THREADS       threads per gthread worker
+#   GUNICORN_PRELOAD       build the app once in the master and fork workers from it (default true)
+#
+# gevent is the default because every open browser tab holds an /api/events stream
+# (the low-stock alert). sync and gthread workers give each stream a worker or
+# thread for its whole life, and in benchmarks/worker_modes.py --streams they stop
+# serving checkouts once the streams outnumber them, while gevent keeps serving.
+# The benchmark compares the three under a mixed checkout/report load (run it
+# against Postgres to size the pools);
+# benchmarks/startup.py times a cold start to the first served request.
+import os
+
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+if worker_class not in WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {worker_class!r}")
+
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+# gthread: each thread serves one request on its own scoped session and pooled connection
+threads = int(os.environ.get('GUNICORN_THREADS', 1)) if worker_class == 'gthread' else 1
+# gevent: idle SSE streams and requests waiting on Postgres are cheap greenlets
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Imports and create_app() run once; workers share those pages copy-on-write.
+# Engines and the log listener are reset in each worker after fork (see create_app).
+# Code changes then need a new master: start-production.sh upgrades with USR2.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+pidfile = os.environ.get('GUNICORN_PIDFILE') or None
+
+# Longer than the report statement timeout, so slow reports fail in the database first
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 90))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# The app logs one JSON access line per request (LOG_REQUESTS); set to '-' to also get gunicorn's
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+if worker_class == 'gevent':
+    # Patch before the app (and psycopg2) is imported, also under --preload, and
+    # make psycopg2 wait for the database on the gevent hub instead of blocking.
+    # This is the only place psycopg2 is made green: run gevent workers with this file
+    from gevent import monkey
+    monkey.patch_all()
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the shared metrics directory
+    from services.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -1,5 +1,27 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_migrate import Migrate
+import sqlalchemy as sa
 
-db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+
+class RoutingSession(Session):
+    """
+    Sends reads to `g.read_engine` (set by services.replica for read-only views)
+    while anything flushed, inserted, updated or deleted stays on the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        read_engine = g.get('read_engine') if has_app_context() else None
+        if (
+            bind is None
+            and read_engine is not None
+            and not self._flushing
+            and not isinstance(clause, sa.UpdateBase)
+        ):
+            return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
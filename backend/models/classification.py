@@ -0,0 +1,47 @@
+from . import db
+from datetime import datetime
+
+class ProductClassification(db.Model):
+    """Latest ABC/XYZ class, sell-through and weeks of supply per product, written by services.classification"""
+    __tablename__ = 'product_classifications'
+    __table_args__ = (
+        db.Index('ix_product_classifications_abc_xyz', 'abc_class', 'xyz_class'),
+    )
+    
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    abc_class = db.Column(db.String(1), nullable=False)  # A/B/C by revenue contribution
+    xyz_class = db.Column(db.String(1), nullable=False)  # X/Y/Z by weekly demand variability
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    revenue_share = db.Column(db.Float, nullable=False, default=0)
+    cumulative_share = db.Column(db.Float, nullable=False, default=0)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    demand_cv = db.Column(db.Float)  # None when nothing sold
+    sell_through_rate = db.Column(db.Float)
+    weeks_of_supply = db.Column(db.Float)  # None when nothing sold
+    stock = db.Column(db.Integer, nullable=False, default=0)
+    period_start = db.Column(db.Date, nullable=False)
+    period_end = db.Column(db.Date, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    product = db.relationship('Product')
+    
+    def to_dict(self):
+        return {
+            'product_id': self.product_id,
+            'name': self.product.name if self.product else None,
+            'brand': self.product.brand if self.product else None,
+            'category': self.product.category if self.product else None,
+            'abc_class': self.abc_class,
+            'xyz_class': self.xyz_class,
+            'revenue': self.revenue,
+            'revenue_share': self.revenue_share,
+            'cumulative_share': self.cumulative_share,
+            'units_sold': self.units_sold,
+            'demand_cv': self.demand_cv,
+            'sell_through_rate': self.sell_through_rate,
+            'weeks_of_supply': self.weeks_of_supply,
+            'stock': self.stock,
+            'period_start': self.period_start.isoformat(),
+            'period_end': self.period_end.isoformat(),
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
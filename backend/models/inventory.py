@@ -1,4 +1,5 @@
 from . import db
+from services.clock import stamp_business_date
 from datetime import datetime
 
 class InventoryItem(db.Model):
@@ -11,5 +12,8 @@ class InventoryItem(db.Model):
     batch_number = db.Column(db.String(50))
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    business_date = db.Column(db.Date, index=True)  # shop-local day, set on insert
     
     product = db.relationship('Product', back_populates='inventory_items')
+
+db.event.listen(InventoryItem, 'before_insert', stamp_business_date)
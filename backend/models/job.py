@@ -0,0 +1,38 @@
+from . import db
+from datetime import datetime
+
+class Job(db.Model):
+    """A queued background report, claimed and run by `flask run-jobs` workers"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_created_at', 'status', 'created_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    result = db.Column(db.JSON)  # small JSON results
+    result_path = db.Column(db.String(255))  # file results, served by /api/jobs/<id>/result
+    result_filename = db.Column(db.String(100))
+    result_mimetype = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    worker = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'type': self.job_type,
+            'params': self.params,
+            'status': self.status,
+            'result': self.result,
+            'has_file': self.result_path is not None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
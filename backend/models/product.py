@@ -22,7 +22,8 @@ class Product(db.Model):
     inventory_items = db.relationship('InventoryItem', back_populates='product')
 
     
-    def to_dict(self):
+    def to_dict(self, current_stock=None):
+        """`current_stock` skips the per-product stock queries when the caller already has it"""
         return {
             'id': self.id,
             'name': self.name,
@@ -35,7 +36,7 @@ class Product(db.Model):
             'wholesale_price': self.wholesale_price,
             'supplier': self.supplier,
             'sku': self.sku,
-            'current_stock': self.get_current_stock(),
+            'current_stock': self.get_current_stock() if current_stock is None else current_stock,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
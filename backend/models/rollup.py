@@ -0,0 +1,24 @@
+from . import db
+
+class SalesDailyRollup(db.Model):
+    """Per business day, per product sales totals maintained alongside each sale"""
+    __tablename__ = 'sales_daily_rollup'
+    
+    business_date = db.Column(db.Date, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    brand = db.Column(db.String(50))
+    category = db.Column(db.String(50))
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    cost = db.Column(db.Float, nullable=False, default=0)
+    
+    product = db.relationship('Product')
+
+class SalesHourlyRollup(db.Model):
+    """Per business day, per shop-local hour sale counts and revenue for the peak-hours heatmap"""
+    __tablename__ = 'sales_hourly_rollup'
+    
+    business_date = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.Integer, primary_key=True)  # 0-23 in SHOP_TIMEZONE
+    transactions = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
@@ -1,20 +1,27 @@
 from . import db
+from services.clock import stamp_business_date
 from datetime import datetime
 
+SALE_TYPES = ('retail', 'wholesale')
+
 class Sale(db.Model):
     __tablename__ = 'sales'
     
     id = db.Column(db.Integer, primary_key=True)
     invoice_number = db.Column(db.String(50), unique=True)
-    sale_type = db.Column(db.String(20), nullable=False)  # 'retail' or 'wholesale'
+    sale_type = db.Column(db.String(20), nullable=False)  # one of SALE_TYPES
     total_amount = db.Column(db.Float, nullable=False)
     payment_method = db.Column(db.String(20), default='cash')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    business_date = db.Column(db.Date, index=True)  # shop-local day, set on insert
     
     items = db.relationship('SaleItem', backref='sale', cascade='all, delete-orphan')
 
 class SaleItem(db.Model):
     __tablename__ = 'sale_items'
+    __table_args__ = (
+        db.Index('ix_sale_items_sale_id_product_id', 'sale_id', 'product_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'), nullable=False)
@@ -22,4 +29,13 @@ class SaleItem(db.Model):
     quantity = db.Column(db.Integer, nullable=False)
     unit_price = db.Column(db.Float, nullable=False)
     
-    product = db.relationship('Product')
\ No newline at end of file
+    # Snapshot of the product at sale time so profit and brand/category
+    # reports don't shift when the product is edited later
+    unit_cost = db.Column(db.Float)
+    product_name = db.Column(db.String(100))
+    product_brand = db.Column(db.String(50))
+    product_category = db.Column(db.String(50))
+    
+    product = db.relationship('Product')
+
+db.event.listen(Sale, 'before_insert', stamp_business_date)
@@ -0,0 +1,13 @@
+from . import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """JWTs that must no longer be accepted: rotated refresh tokens and tokens revoked at logout"""
+    __tablename__ = 'revoked_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False, index=True)
+    token_type = db.Column(db.String(10), nullable=False)  # 'access' or 'refresh'
+    user_id = db.Column(db.Integer)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
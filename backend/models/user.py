@@ -11,6 +11,8 @@ class User(db.Model):
     password_hash = db.Column(db.Text)
     role = db.Column(db.String(20), default='staff')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Refresh tokens issued before this are rejected (set when the role changes)
+    tokens_valid_after = db.Column(db.DateTime)
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -18,6 +20,15 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
+    def set_role(self, role):
+        """Change the role and invalidate refresh tokens carrying the old one"""
+        self.role = role
+        self.tokens_valid_after = datetime.utcnow()
+    
+    def accepts_token_issued_at(self, issued_at):
+        """False for tokens (by whole-second `iat`) issued up to the last role change"""
+        return self.tokens_valid_after is None or datetime.utcfromtimestamp(issued_at) > self.tokens_valid_after
+    
     def to_dict(self):
         return {
             'id': self.id,
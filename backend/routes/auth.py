@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token, jwt_required, get_jwt, get_jwt_identity
 from models import db
 from models.user import User
-import traceback  # ✅ import traceback for logging
+from services.roles import ROLE_PERMISSIONS, role_claims, require_permission
+from services.tokens import revoke
+from services.throttle import check_login, throttle_counters
+import logging
 
 auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -16,21 +20,24 @@ def register():
     if User.query.filter_by(username=data['username']).first():
         return jsonify({'message': 'Username already exists'}), 400
     
+    # Self-registration always yields staff; roles change only through PUT /users/<id>/role
     user = User(
         username=data['username'],
         email=data.get('email', ''),
-        role=data.get('role', 'staff')
+        role='staff'
     )
     user.set_password(data['password'])
     
     db.session.add(user)
     db.session.commit()
     
-    access_token = create_access_token(identity=user.id)
+    claims = role_claims(user.role)
+    access_token = create_access_token(identity=user.id, additional_claims=claims)
     
     return jsonify({
         'message': 'User registered successfully',
         'access_token': access_token,
+        'refresh_token': create_refresh_token(identity=user.id, additional_claims=claims),
         'user': user.to_dict()
     }), 201
 
@@ -38,24 +45,112 @@ def register():
 def login():
     try:
         data = request.get_json()
-        print("Login payload:", data)
 
         if not data or not data.get('username') or not data.get('password'):
             return jsonify({'message': 'Missing username or password'}), 400
 
+        # Reject bursts before the user lookup and the deliberately slow hash check
+        retry_after = check_login(data['username'], request.remote_addr)
+        if retry_after is not None:
+            response = jsonify({'message': 'Too many login attempts, try again later'})
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+
         user = User.query.filter_by(username=data['username']).first()
-        print("User found:", user)
 
         if user and user.check_password(data['password']):
-            access_token = create_access_token(identity=user.id)
+            claims = role_claims(user.role)
+            access_token = create_access_token(identity=user.id, additional_claims=claims)
             return jsonify({
                 'message': 'Login successful',
                 'access_token': access_token,
+                'refresh_token': create_refresh_token(identity=user.id, additional_claims=claims),
                 'user': user.to_dict()
             }), 200
 
         return jsonify({'message': 'Invalid credentials'}), 401
 
     except Exception as e:
-        traceback.print_exc()  # ✅ print full error
+        logger.exception("Login failed")
+        return jsonify({'message': 'Server error', 'error': str(e)}), 500
+
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """Swap a refresh token for a new access/refresh pair; the presented refresh token is revoked"""
+    try:
+        identity = get_jwt_identity()
+        payload = get_jwt()
+        if not revoke(payload):
+            # Another request already rotated this token
+            return jsonify({'message': 'Token has been revoked'}), 401
+
+        # Claims come from the user row, not the presented token, so a role
+        # change reaches the next refresh; refreshing is rare enough for the lookup
+        user = db.session.get(User, identity)
+        if user is None:
+            return jsonify({'message': 'User not found'}), 401
+        if not user.accepts_token_issued_at(payload['iat']):
+            return jsonify({'message': 'Token has been revoked'}), 401
+        claims = role_claims(user.role)
+
+        return jsonify({
+            'access_token': create_access_token(identity=identity, additional_claims=claims),
+            'refresh_token': create_refresh_token(identity=identity, additional_claims=claims)
+        }), 200
+
+    except Exception as e:
+        logger.exception("Token refresh failed")
+        return jsonify({'message': 'Server error', 'error': str(e)}), 500
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """Revoke the presented token and, if given in the body, the matching refresh token"""
+    try:
+        revoke(get_jwt())
+
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            try:
+                refresh_payload = decode_token(data['refresh_token'], allow_expired=True)
+            except Exception:
+                refresh_payload = None
+            if refresh_payload and refresh_payload.get('sub') == get_jwt_identity():
+                revoke(refresh_payload)
+
+        return jsonify({'message': 'Logged out'}), 200
+
+    except Exception as e:
+        logger.exception("Logout failed")
+        return jsonify({'message': 'Server error', 'error': str(e)}), 500
+
+@auth_bp.route('/throttle-stats', methods=['GET'])
+@require_permission('auth:stats')
+def throttle_stats():
+    """Login attempts rejected by the throttle, per scope, across all workers"""
+    return jsonify({'throttled': throttle_counters()}), 200
+
+
+@auth_bp.route('/users/<int:user_id>/role', methods=['PUT'])
+@require_permission('users:manage')
+def set_user_role(user_id):
+    """Change a user's role; their refresh tokens are revoked, so it applies from their next login"""
+    data = request.get_json(silent=True) or {}
+    role = data.get('role')
+    if role not in ROLE_PERMISSIONS:
+        return jsonify({'message': f"Invalid role, expected one of {', '.join(ROLE_PERMISSIONS)}"}), 400
+
+    try:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return jsonify({'message': 'User not found'}), 404
+
+        user.set_role(role)
+        db.session.commit()
+        return jsonify({'message': 'Role updated', 'user': user.to_dict()}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Role update failed")
         return jsonify({'message': 'Server error', 'error': str(e)}), 500
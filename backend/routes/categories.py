@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required
 from models import db
 from models.category import Category
 from models.brand import Brand
+from services.roles import require_permission
 
 categories_bp = Blueprint('categories', __name__)
 
@@ -15,7 +16,7 @@ def list_categories():
     return jsonify([c.to_dict() for c in categories]), 200
 
 @categories_bp.route('/categories', methods=['POST'])
-@jwt_required()
+@require_permission('catalog:write')
 def add_category():
     data = request.get_json()
     category = Category(name=data['name'], description=data.get('description', ''))
@@ -24,7 +25,7 @@ def add_category():
     return jsonify({'message': 'Category added'}), 201
 
 @categories_bp.route('/categories/<int:id>', methods=['PUT'])
-@jwt_required()
+@require_permission('catalog:write')
 def update_category(id):
     data = request.get_json()
     category = Category.query.get_or_404(id)
@@ -34,7 +35,7 @@ def update_category(id):
     return jsonify({'message': 'Category updated'}), 200
 
 @categories_bp.route('/categories/<int:id>', methods=['DELETE'])
-@jwt_required()
+@require_permission('catalog:delete')
 def delete_category(id):
     category = Category.query.get_or_404(id)
     db.session.delete(category)
@@ -50,7 +51,7 @@ def list_brands():
     return jsonify([b.to_dict() for b in brands]), 200
 
 @categories_bp.route('/brands', methods=['POST'])
-@jwt_required()
+@require_permission('catalog:write')
 def add_brand():
     data = request.get_json()
     brand = Brand(name=data['name'], country=data.get('country', ''))
@@ -59,7 +60,7 @@ def add_brand():
     return jsonify({'message': 'Brand added'}), 201
 
 @categories_bp.route('/brands/<int:id>', methods=['PUT'])
-@jwt_required()
+@require_permission('catalog:write')
 def update_brand(id):
     data = request.get_json()
     brand = Brand.query.get_or_404(id)
@@ -69,7 +70,7 @@ def update_brand(id):
     return jsonify({'message': 'Brand updated'}), 200
 
 @categories_bp.route('/brands/<int:id>', methods=['DELETE'])
-@jwt_required()
+@require_permission('catalog:delete')
 def delete_brand(id):
     brand = Brand.query.get_or_404(id)
     db.session.delete(brand)
@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, jsonify, current_app, g
+from flask_jwt_extended import jwt_required
+from services import analytics
+from services.replica import read_replica, use_replica, using_replica
+from services.cache import cached_response
+from services.querystats import current_query_stats
+import logging
+
+dashboard_bp = Blueprint('dashboard', __name__)
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Created on first use so each gunicorn worker owns its own threads
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config['DASHBOARD_MAX_WORKERS'],
+                thread_name_prefix='dashboard'
+            )
+    return _executor
+
+
+def _run_widget(app, widget, replica, query_stats):
+    # Each thread gets its own app context and therefore its own pooled session
+    with app.app_context():
+        g.db_role = 'reports'
+        if replica:
+            use_replica()
+        if query_stats is not None:
+            g.query_stats = query_stats
+        return widget()
+
+
+@dashboard_bp.route('', methods=['GET'])
+@jwt_required()
+@cached_response
+@read_replica
+def get_dashboard():
+    """Every dashboard widget in one response, queried concurrently"""
+    try:
+        logger.debug("Getting dashboard widgets")
+
+        app = current_app._get_current_object()
+        threshold = app.config['LOW_STOCK_THRESHOLD']
+        widgets = {
+            'overview': analytics.sales_overview,
+            'sales_trend': analytics.sales_trend,
+            'top_products': lambda: analytics.product_performance(limit=5),
+            'categories': analytics.category_performance,
+            'brands': analytics.brand_performance,
+            'inventory': lambda: analytics.inventory_summary(threshold),
+            'recent_sales': analytics.recent_sales
+        }
+
+        executor = _get_executor()
+        replica = using_replica()
+        query_stats = current_query_stats()
+        futures = {
+            name: executor.submit(_run_widget, app, widget, replica, query_stats)
+            for name, widget in widgets.items()
+        }
+
+        return jsonify({
+            'success': True,
+            **{name: future.result() for name, future in futures.items()}
+        }), 200
+
+    except Exception as e:
+        logger.exception("Error getting dashboard")
+        return jsonify({'success': False, 'message': str(e)}), 500
@@ -0,0 +1,33 @@
+import json
+import queue
+from flask import Blueprint, Response, current_app
+from flask_jwt_extended import jwt_required
+from services.events import subscribe, unsubscribe
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])  # EventSource cannot send headers
+def stream_events():
+    """Server-Sent Events stream of sale-created, stock-changed and low-stock events"""
+    heartbeat = current_app.config['EVENTS_HEARTBEAT_SECONDS']
+    subscriber = subscribe()
+    
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            unsubscribe(subscriber)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -1,10 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from models import db
 from models.inventory import InventoryItem
 from models.product import Product
+from services.replica import read_replica
+from services.cache import cached_response, bump_data_version
+from services.events import publish_stock_changes
+import logging
 
 inventory_bp = Blueprint('inventory', __name__)
+logger = logging.getLogger(__name__)
 
 @inventory_bp.route('/stock-in', methods=['POST'])
 @jwt_required()
@@ -29,6 +34,8 @@ def stock_in():
     
     db.session.add(transaction)
     db.session.commit()
+    bump_data_version()
+    publish_stock_changes([product.id])
     
     return jsonify({
         'message': 'Stock added successfully',
@@ -55,4 +62,32 @@ def list_transactions():
             'created_at': t.created_at.isoformat()
         })
     
-    return jsonify({'transactions': result, 'count': len(result)}), 200
\ No newline at end of file
+    return jsonify({'transactions': result, 'count': len(result)}), 200
+
+
+@inventory_bp.route('/reorder-suggestions', methods=['GET'])
+@jwt_required()
+@cached_response
+@read_replica
+def get_reorder_suggestions():
+    """Products to reorder from projected demand; optional history_days, lead_time, cover_days and limit"""
+    # NumPy is only loaded by workers that serve this report
+    from services.reorder import reorder_suggestions
+
+    try:
+        config = current_app.config
+        history_days = max(7, min(request.args.get('history_days', config['REORDER_HISTORY_DAYS'], type=int), 730))
+        lead_time_days = max(0, min(request.args.get('lead_time', config['REORDER_LEAD_TIME_DAYS'], type=int), 180))
+        cover_days = max(0, min(request.args.get('cover_days', config['REORDER_COVER_DAYS'], type=int), 365))
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        
+        suggestions = reorder_suggestions(history_days, lead_time_days, cover_days, limit)
+        return jsonify({
+            'success': True,
+            'suggestions': suggestions,
+            'count': len(suggestions)
+        }), 200
+        
+    except Exception as e:
+        logger.exception("Error getting reorder suggestions")
+        return jsonify({'success': False, 'message': str(e)}), 500
@@ -0,0 +1,69 @@
+import os
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.job import Job
+from services.jobs import enqueue
+import logging
+
+jobs_bp = Blueprint('jobs', __name__)
+logger = logging.getLogger(__name__)
+
+
+def _get_own_job(job_id):
+    return Job.query.filter_by(id=job_id, user_id=get_jwt_identity()).first()
+
+
+@jobs_bp.route('', methods=['POST'])
+@jwt_required()
+def create_job():
+    """Queue a background report: {"type": "export-sales", "params": {"from": ..., "to": ..., "format": ...}}"""
+    data = request.get_json(silent=True) or {}
+    if not data.get('type'):
+        return jsonify({'success': False, 'message': 'Missing job type'}), 400
+    
+    try:
+        job = enqueue(data['type'], data.get('params'), user_id=get_jwt_identity())
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    logger.info("Queued job %s (%s)", job.id, job.job_type)
+    return jsonify({'success': True, 'job': job.to_dict()}), 202
+
+
+@jobs_bp.route('', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    jobs = Job.query.filter_by(user_id=get_jwt_identity()).order_by(Job.created_at.desc()).limit(20).all()
+    return jsonify({'success': True, 'jobs': [job.to_dict() for job in jobs], 'count': len(jobs)}), 200
+
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    job = _get_own_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()}), 200
+
+
+@jobs_bp.route('/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+def get_job_result(job_id):
+    """Download a finished job's file, or its JSON result"""
+    job = _get_own_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    if job.status != 'succeeded':
+        return jsonify({'success': False, 'message': f'Job is {job.status}', 'job': job.to_dict()}), 409
+    
+    if job.result_path:
+        if not os.path.exists(job.result_path):
+            return jsonify({'success': False, 'message': 'Result file has been removed'}), 410
+        return send_file(
+            job.result_path,
+            mimetype=job.result_mimetype,
+            as_attachment=True,
+            download_name=job.result_filename
+        )
+    
+    return jsonify({'success': True, 'result': job.result}), 200
@@ -2,20 +2,21 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models import db
 from models.product import Product
+from services.analytics import stock_levels
+from services.cache import bump_data_version
+from services.roles import require_permission
 import uuid
+import logging
 
 products_bp = Blueprint('products', __name__)
+logger = logging.getLogger(__name__)
 
 # ✅ NUCLEAR FIX: Define routes without trailing slash confusion
 @products_bp.route('', methods=['GET', 'POST', 'OPTIONS'])  # Empty string, not '/'
 @products_bp.route('/', methods=['GET', 'POST', 'OPTIONS'])  # Also handle with slash
 def handle_products():
-    print(f"🔍 Request method: {request.method}")
-    print(f"🔍 Request path: {request.path}")
-    
     # Handle OPTIONS for CORS - NO JWT CHECK HERE
     if request.method == 'OPTIONS':
-        print("✅ Handling OPTIONS request")
         response = jsonify({})
         response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
         response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
@@ -33,22 +34,25 @@ def handle_products():
 @jwt_required()
 def get_all_products():
     try:
-        print("🔍 Getting all products...")
-        products = Product.query.order_by(Product.created_at.desc()).all()
+        # Stock for every product in the same query instead of two per product
+        stock = stock_levels()
+        products = db.session.query(Product, db.func.coalesce(stock.c.stock, 0)).outerjoin(
+            stock, stock.c.product_id == Product.id
+        ).order_by(Product.created_at.desc()).all()
         return jsonify({
             'success': True,
-            'products': [product.to_dict() for product in products],
+            'products': [product.to_dict(current_stock=current_stock) for product, current_stock in products],
             'count': len(products)
         }), 200
     except Exception as e:
-        print(f"❌ Error getting products: {e}")
+        logger.exception("Error getting products")
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@jwt_required()
+@require_permission('catalog:write')
 def create_new_product():
     try:
         data = request.get_json()
-        print(f"🔍 Creating product with data: {data}")
+        logger.debug("Creating product with data: %s", data)
 
         # Validate required fields
         required_fields = ['name', 'brand', 'category', 'size', 'color', 
@@ -85,8 +89,9 @@ def create_new_product():
 
         db.session.add(product)
         db.session.commit()
+        bump_data_version()
         
-        print(f"✅ Product created: {product.name} with SKU: {sku}")
+        logger.info("Product created: %s with SKU: %s", product.name, sku)
 
         return jsonify({
             'success': True,
@@ -96,7 +101,7 @@ def create_new_product():
 
     except Exception as e:
         db.session.rollback()
-        print(f"❌ Error creating product: {e}")
+        logger.exception("Error creating product")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # Handle individual product operations
@@ -127,7 +132,7 @@ def get_product_by_id(product_id):
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@jwt_required()
+@require_permission('catalog:write')
 def update_product_by_id(product_id):
     try:
         product = Product.query.get_or_404(product_id)
@@ -146,6 +151,7 @@ def update_product_by_id(product_id):
                 setattr(product, field, float(data[field]))
 
         db.session.commit()
+        bump_data_version()
 
         return jsonify({
             'success': True,
@@ -157,7 +163,7 @@ def update_product_by_id(product_id):
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@jwt_required()
+@require_permission('catalog:delete')
 def delete_product_by_id(product_id):
     try:
         product = Product.query.get_or_404(product_id)
@@ -171,6 +177,7 @@ def delete_product_by_id(product_id):
 
         db.session.delete(product)
         db.session.commit()
+        bump_data_version()
 
         return jsonify({
             'success': True,
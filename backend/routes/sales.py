@@ -1,16 +1,23 @@
-import pytz
-nairobi_tz = pytz.timezone("Africa/Nairobi")
-
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required
 from models import db
-from models.sale import Sale, SaleItem
+from models.sale import SALE_TYPES, Sale, SaleItem
 from models.inventory import InventoryItem
 from models.product import Product
-from datetime import datetime, timedelta
+from services.rollup import record_sale
+from services import analytics
+from services.clock import business_now
+from services.replica import read_replica
+from services.roles import require_permission
+from services.cache import cached_response, bump_data_version
+from services.events import publish, publish_stock_changes
+from services.export import sale_lines, csv_chunks, xlsx_chunks
+from services.metrics import SALES, SALES_REVENUE
 import uuid
+import logging
 
 sales_bp = Blueprint('sales', __name__)
+logger = logging.getLogger(__name__)
 
 @sales_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -19,8 +26,12 @@ def create_sale():
     
     if not data or not data.get('items') or not data.get('sale_type'):
         return jsonify({'message': 'Missing required fields (items, sale_type)'}), 400
+    if data['sale_type'] not in SALE_TYPES:
+        return jsonify({'message': f"Invalid sale_type, expected one of {', '.join(SALE_TYPES)}"}), 400
     
-    # Validate products and stock
+    # Validate products and stock; each item keeps its product, whatever type the id came in as
+    products = {}
+    lines = []
     for item in data['items']:
         if not item.get('product_id') or not item.get('quantity') or not item.get('unit_price'):
             return jsonify({'message': 'Missing fields in sale items'}), 400
@@ -28,6 +39,8 @@ def create_sale():
         product = Product.query.get(item['product_id'])
         if not product:
             return jsonify({'message': f'Product {item["product_id"]} not found'}), 404
+        products[product.id] = product
+        lines.append((item, product))
         
         current_stock = product.get_current_stock()
         if current_stock < item['quantity']:
@@ -39,7 +52,7 @@ def create_sale():
     total_amount = sum(item['quantity'] * item['unit_price'] for item in data['items'])
     
     # Create sale
-    invoice_number = f"INV-{datetime.now(nairobi_tz).strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+    invoice_number = f"INV-{business_now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
     
     sale = Sale(
         invoice_number=invoice_number,
@@ -52,25 +65,44 @@ def create_sale():
     db.session.flush()  # Get sale ID
     
     # Add sale items and update inventory
-    for item_data in data['items']:
+    sale_items = []
+    for item_data, product in lines:
         sale_item = SaleItem(
             sale_id=sale.id,
-            product_id=item_data['product_id'],
+            product_id=product.id,
             quantity=item_data['quantity'],
-            unit_price=item_data['unit_price']
+            unit_price=item_data['unit_price'],
+            unit_cost=product.purchase_price,
+            product_name=product.name,
+            product_brand=product.brand,
+            product_category=product.category
         )
         db.session.add(sale_item)
+        sale_items.append(sale_item)
         
         # Update inventory (stock out)
         inventory_out = InventoryItem(
-            product_id=item_data['product_id'],
+            product_id=product.id,
             transaction_type='out',
             quantity=item_data['quantity'],
             notes=f"Sale: {invoice_number}"
         )
         db.session.add(inventory_out)
     
+    # Keep the analytics rollup in step with this sale (same transaction)
+    record_sale(sale, sale_items)
+    
     db.session.commit()
+    bump_data_version()
+    SALES.labels(sale.sale_type).inc()
+    SALES_REVENUE.labels(sale.sale_type).inc(total_amount)
+    publish('sale-created', {
+        'sale_id': sale.id,
+        'invoice_number': invoice_number,
+        'total_amount': total_amount,
+        'items_count': len(data['items'])
+    })
+    publish_stock_changes(products.keys())
     
     return jsonify({
         'message': 'Sale created successfully',
@@ -98,28 +130,56 @@ def list_sales():
     
     return jsonify({'sales': result, 'count': len(result)}), 200
 
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_chunks),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_chunks)
+}
+
+@sales_bp.route('/export', methods=['GET'])
+@jwt_required()
+@read_replica
+def export_sales():
+    """Stream every sale line in the from/to business-date range as CSV or XLSX"""
+    try:
+        date_range = analytics.parse_date_range(request.args)
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid format '{export_format}', expected csv or xlsx")
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    logger.info("Exporting sales %s to %s as %s", date_range['date_from'], date_range['date_to'], export_format)
+    
+    mimetype, encode = EXPORT_FORMATS[export_format]
+    period = '_'.join(str(date_range[name] or 'all') for name in ('date_from', 'date_to'))
+    return Response(
+        stream_with_context(encode(sale_lines(**date_range))),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="sales_{period}.{export_format}"',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @sales_bp.route('/<int:sale_id>', methods=['GET'])
 @jwt_required()
 def get_sale_details(sale_id):
     try:
-        print(f"🔍 Backend: Fetching sale details for ID: {sale_id}")
-        
         sale = Sale.query.get_or_404(sale_id)
-        print(f"📦 Backend: Found sale: {sale.invoice_number}")
         
         # Get all sale items with product details
         items = []
         for sale_item in sale.items:
             product = sale_item.product
             if not product:
-                print(f"⚠️ Warning: Product {sale_item.product_id} not found")
+                logger.warning("Sale %s item %s: product %s not found", sale.id, sale_item.id, sale_item.product_id)
                 continue
                 
             item_detail = {
                 'id': sale_item.id,
                 'product_id': sale_item.product_id,
-                'product_name': product.name,
-                'product_brand': product.brand,
+                'product_name': sale_item.product_name or product.name,
+                'product_brand': sale_item.product_brand or product.brand,
                 'product_size': product.size,
                 'product_color': product.color,
                 'quantity': sale_item.quantity,
@@ -127,7 +187,6 @@ def get_sale_details(sale_id):
                 'subtotal': float(sale_item.quantity * sale_item.unit_price)
             }
             items.append(item_detail)
-            print(f"📦 Added item: {product.name} x{sale_item.quantity}")
         
         response_data = {
             'id': sale.id,
@@ -140,345 +199,243 @@ def get_sale_details(sale_id):
             'items': items
         }
         
-        print(f"✅ Backend: Returning {len(items)} items for sale {sale.invoice_number}")
-        
         return jsonify(response_data), 200
         
     except Exception as e:
-        print(f"❌ Backend Error getting sale details: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting sale details")
         return jsonify({'error': str(e)}), 500
 
 @sales_bp.route('/analytics/overview', methods=['GET'])
 @jwt_required()
+@cached_response
+@read_replica
 def get_sales_analytics():
     try:
-        print("📊 Getting sales analytics overview...")
-        
-        total_sales = db.session.query(db.func.sum(Sale.total_amount)).scalar() or 0
-        total_transactions = Sale.query.count()
-        
-        today = datetime.now(nairobi_tz).date()
-        today_sales = db.session.query(db.func.sum(Sale.total_amount)).filter(
-            db.func.date(Sale.created_at) == today
-        ).scalar() or 0
+        logger.debug("Getting sales analytics overview")
         
         return jsonify({
             'success': True,
-            'overview': {
-                'total_sales': float(total_sales),
-                'total_transactions': total_transactions,
-                'today_sales': float(today_sales),
-                'average_sale': float(total_sales / total_transactions) if total_transactions > 0 else 0
-            }
+            'overview': analytics.sales_overview()
         }), 200
         
     except Exception as e:
-        print(f"❌ Error getting sales analytics: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting sales analytics")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @sales_bp.route('/analytics/sales-trend', methods=['GET'])
 @jwt_required()
+@cached_response
+@read_replica
 def get_sales_trend():
     try:
-        print("📊 Getting sales trend...")
-        
-        trend_data = []
-        today = datetime.now(nairobi_tz).date()
-        
-        for i in range(6, -1, -1):
-            date = today - timedelta(days=i)
-            day_name = date.strftime('%a')
-            
-            daily_sales = db.session.query(db.func.sum(Sale.total_amount)).filter(
-                db.func.date(Sale.created_at) == date
-            ).scalar() or 0
-            
-            daily_transactions = db.session.query(db.func.count(Sale.id)).filter(
-                db.func.date(Sale.created_at) == date
-            ).scalar() or 0
-            
-            trend_data.append({
-                'name': day_name,
-                'sales': float(daily_sales),
-                'transactions': int(daily_transactions),
-                'date': date.isoformat()
-            })
+        logger.debug("Getting sales trend")
         
         return jsonify({
             'success': True,
-            'trend': trend_data
+            'trend': analytics.sales_trend()
         }), 200
         
     except Exception as e:
-        print(f"❌ Error getting sales trend: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting sales trend")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # ✅ FIXED: Product Performance with Real Profit
 @sales_bp.route('/analytics/product-performance', methods=['GET'])
 @jwt_required()
+@cached_response
+@read_replica
 def get_product_performance():
+    """Top products; accepts the shared analytics filters plus limit and sort=units|revenue|profit"""
     try:
-        print("📊 Getting product performance with REAL profit...")
+        filters = analytics.parse_filters(request.args)
+        sort = request.args.get('sort', 'units')
+        if sort not in analytics.PRODUCT_SORTS:
+            raise ValueError(f"Invalid sort '{sort}', expected one of {', '.join(analytics.PRODUCT_SORTS)}")
+        limit = max(1, min(request.args.get('limit', 20, type=int) or 20, 200))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        logger.debug("Getting product performance with REAL profit")
         
-        # Get products with sales data
-        query = """
-        SELECT 
-            p.id,
-            p.name,
-            p.brand,
-            p.purchase_price,
-            COALESCE(SUM(si.quantity), 0) as units_sold,
-            COALESCE(SUM(si.quantity * si.unit_price), 0) as revenue,
-            COALESCE(SUM(si.quantity * (si.unit_price - p.purchase_price)), 0) as actual_profit
-        FROM products p
-        LEFT JOIN sale_items si ON p.id = si.product_id
-        LEFT JOIN sales s ON si.sale_id = s.id
-        GROUP BY p.id, p.name, p.brand, p.purchase_price
-        HAVING COALESCE(SUM(si.quantity), 0) > 0
-        ORDER BY units_sold DESC
-        LIMIT 20
-        """
+        return jsonify({
+            'success': True,
+            'products': analytics.product_performance(limit=limit, sort=sort, **filters)
+        }), 200
         
-        result = db.session.execute(db.text(query))
-        products = []
+    except Exception as e:
+        logger.exception("Error getting product performance")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@sales_bp.route('/analytics/monthly-trend', methods=['GET'])
+@jwt_required()
+@cached_response
+@read_replica
+def get_monthly_trend():
+    """Get monthly revenue and REAL profit trend (last `months` months, default 6)"""
+    try:
+        logger.debug("Getting monthly trend with REAL profit")
         
-        for row in result:
-            # Calculate current stock for this product using the same method as Product.get_current_stock()
-            total_in = db.session.query(db.func.sum(InventoryItem.quantity)).filter_by(
-                product_id=row.id, 
-                transaction_type='in'
-            ).scalar() or 0
-            
-            total_out = db.session.query(db.func.sum(InventoryItem.quantity)).filter_by(
-                product_id=row.id, 
-                transaction_type='out'
-            ).scalar() or 0
-            
-            current_stock = total_in - total_out
-            
-            product_data = {
-                'id': row.id,
-                'name': row.name,
-                'brand': row.brand,
-                'units_sold': int(row.units_sold),
-                'revenue': float(row.revenue),
-                'actual_profit': float(row.actual_profit),  # ✅ Fixed: using 'actual_profit'
-                'stock': int(current_stock),
-                'profit_margin': round((row.actual_profit / row.revenue * 100), 2) if row.revenue > 0 else 0
-            }
-            products.append(product_data)
-            print(f"📦 Product: {row.name} - Units: {row.units_sold}, Revenue: {row.revenue}, Profit: {row.actual_profit}")
+        months = max(1, min(request.args.get('months', 6, type=int) or 6, 120))
         
-        print(f"✅ Found {len(products)} products with sales data")
-        return jsonify({'success': True, 'products': products}), 200
+        return jsonify({
+            'success': True,
+            'monthly_trend': analytics.monthly_trend(months)
+        }), 200
         
     except Exception as e:
-        print(f"❌ Error getting product performance: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting monthly trend")
         return jsonify({'success': False, 'message': str(e)}), 500
 
-@sales_bp.route('/analytics/monthly-trend', methods=['GET'])
+@sales_bp.route('/analytics/heatmap', methods=['GET'])
 @jwt_required()
-def get_monthly_trend():
-    """Get monthly revenue and REAL profit trend (last 6 months)"""
+@cached_response
+@read_replica
+def get_sales_heatmap():
+    """Transactions and revenue by weekday x hour of day (shop-local) for optional from/to"""
+    try:
+        date_range = analytics.parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
     try:
-        print("📊 Getting monthly trend with REAL profit...")
+        logger.debug("Getting sales heatmap")
         
-        monthly_data = []
-        today = datetime.now(nairobi_tz).date()
+        return jsonify({
+            'success': True,
+            'heatmap': analytics.sales_heatmap(
+                rollup_after_days=current_app.config['HEATMAP_ROLLUP_DAYS'], **date_range
+            )
+        }), 200
         
-        for i in range(5, -1, -1):  # Last 6 months
-            # Calculate start and end of month
-            if i == 0:
-                month_start = today.replace(day=1)
-                if today.month == 12:
-                    month_end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-                else:
-                    month_end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-            else:
-                # Go back i months
-                year = today.year
-                month = today.month - i
-                if month <= 0:
-                    month += 12
-                    year -= 1
-                month_start = datetime(year, month, 1).date()
-                if month == 12:
-                    month_end = datetime(year + 1, 1, 1).date() - timedelta(days=1)
-                else:
-                    month_end = datetime(year, month + 1, 1).date() - timedelta(days=1)
-            
-            # Query for real profit calculation
-            query = """
-            SELECT 
-                COALESCE(SUM(si.quantity * si.unit_price), 0) as revenue,
-                COALESCE(SUM(si.quantity * (si.unit_price - p.purchase_price)), 0) as actual_profit
-            FROM sale_items si
-            JOIN sales s ON si.sale_id = s.id
-            JOIN products p ON si.product_id = p.id
-            WHERE DATE(s.created_at) >= :start_date AND DATE(s.created_at) <= :end_date
-            """
-            
-            result = db.session.execute(db.text(query), {
-                'start_date': month_start,
-                'end_date': month_end
-            }).fetchone()
-            
-            revenue = float(result.revenue) if result.revenue else 0
-            actual_profit = float(result.actual_profit) if result.actual_profit else 0
-            
-            monthly_data.append({
-                'month': month_start.strftime('%b'),
-                'revenue': revenue,
-                'profit': actual_profit,  # ✅ REAL profit, not 30% estimate
-                'profit_margin': (actual_profit / revenue * 100) if revenue > 0 else 0
-            })
+    except Exception as e:
+        logger.exception("Error getting sales heatmap")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@sales_bp.route('/analytics/classification', methods=['GET'])
+@jwt_required()
+@cached_response
+@read_replica
+def get_product_classification():
+    """Stored ABC/XYZ classification; page, per_page, sort, abc, xyz, brand and category"""
+    # Imported on first use: the classification service pulls in NumPy
+    from services.classification import CLASSIFICATION_SORTS, classification_page
+
+    try:
+        sort = request.args.get('sort', 'revenue')
+        if sort not in CLASSIFICATION_SORTS:
+            raise ValueError(f"Invalid sort '{sort}', expected one of {', '.join(CLASSIFICATION_SORTS)}")
+        abc_class = request.args.get('abc') or None
+        xyz_class = request.args.get('xyz') or None
+        if abc_class not in (None, 'A', 'B', 'C') or xyz_class not in (None, 'X', 'Y', 'Z'):
+            raise ValueError("'abc' must be A, B or C and 'xyz' must be X, Y or Z")
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), 500))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        logger.debug("Getting product classification")
+        
+        return jsonify({
+            'success': True,
+            **classification_page(
+                page=page, per_page=per_page, sort=sort, abc_class=abc_class, xyz_class=xyz_class,
+                brand=request.args.get('brand') or None, category=request.args.get('category') or None
+            )
+        }), 200
+        
+    except Exception as e:
+        logger.exception("Error getting product classification")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@sales_bp.route('/analytics/classification/refresh', methods=['POST'])
+@require_permission('analytics:refresh')
+def refresh_product_classification():
+    """Recompute and store the ABC/XYZ classification over the last `weeks` weeks (default 13)"""
+    from services.classification import refresh_classifications
+
+    try:
+        weeks = max(2, min(request.args.get('weeks', 13, type=int), 104))
+        rows = refresh_classifications(weeks)
+        bump_data_version()
         
-        print("✅ Generated monthly trend with REAL profit calculations")
         return jsonify({
             'success': True,
-            'monthly_trend': monthly_data
+            'message': f'Classified {rows} products',
+            'count': rows
         }), 200
         
     except Exception as e:
-        print(f"❌ Error getting monthly trend: {e}")
-        import traceback
-        traceback.print_exc()
+        db.session.rollback()
+        logger.exception("Error refreshing product classification")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @sales_bp.route('/analytics/profit-summary', methods=['GET'])
 @jwt_required()
+@cached_response
+@read_replica
 def get_profit_summary():
     """Get overall profit summary with real calculations"""
     try:
-        print("📊 Getting profit summary...")
-        
-        # Calculate total real profit
-        query = """
-        SELECT 
-            COALESCE(SUM(si.quantity * si.unit_price), 0) as total_revenue,
-            COALESCE(SUM(si.quantity * p.purchase_price), 0) as total_cost,
-            COALESCE(SUM(si.quantity * (si.unit_price - p.purchase_price)), 0) as total_profit
-        FROM sale_items si
-        JOIN products p ON si.product_id = p.id
-        JOIN sales s ON si.sale_id = s.id
-        """
-        
-        result = db.session.execute(db.text(query)).fetchone()
-        
-        total_revenue = float(result.total_revenue) if result.total_revenue else 0
-        total_cost = float(result.total_cost) if result.total_cost else 0
-        total_profit = float(result.total_profit) if result.total_profit else 0
-        profit_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+        filters = analytics.parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        logger.debug("Getting profit summary")
         
         return jsonify({
             'success': True,
-            'profit_summary': {
-                'total_revenue': total_revenue,
-                'total_cost': total_cost,
-                'total_profit': total_profit,
-                'profit_margin': profit_margin
-            }
+            'profit_summary': analytics.profit_summary(**filters)
         }), 200
         
     except Exception as e:
-        print(f"❌ Error getting profit summary: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting profit summary")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @sales_bp.route('/analytics/category-performance', methods=['GET'])
 @jwt_required()
+@cached_response
+@read_replica
 def get_category_performance():
     """Get category performance with real profit"""
     try:
-        print("📊 Getting category performance...")
-        
-        query = """
-        SELECT 
-            p.category,
-            COALESCE(SUM(si.quantity * si.unit_price), 0) as revenue,
-            COALESCE(SUM(si.quantity * (si.unit_price - p.purchase_price)), 0) as profit,
-            COALESCE(SUM(si.quantity), 0) as units_sold
-        FROM products p
-        LEFT JOIN sale_items si ON p.id = si.product_id
-        LEFT JOIN sales s ON si.sale_id = s.id
-        GROUP BY p.category
-        HAVING COALESCE(SUM(si.quantity), 0) > 0
-        ORDER BY revenue DESC
-        """
-        
-        result = db.session.execute(db.text(query))
-        categories = []
-        colors = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884D8', '#82ca9d']
-        
-        for i, row in enumerate(result):
-            categories.append({
-                'name': row.category,
-                'value': float(row.revenue),
-                'profit': float(row.profit),
-                'units_sold': int(row.units_sold),
-                'color': colors[i % len(colors)]
-            })
+        filters = analytics.parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        logger.debug("Getting category performance")
         
         return jsonify({
             'success': True,
-            'categories': categories
+            'categories': analytics.category_performance(**filters)
         }), 200
         
     except Exception as e:
-        print(f"❌ Error getting category performance: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting category performance")
         return jsonify({'success': False, 'message': str(e)}), 500
 
 @sales_bp.route('/analytics/brand-performance', methods=['GET'])
 @jwt_required()
+@cached_response
+@read_replica
 def get_brand_performance():
     """Get brand performance with real profit"""
     try:
-        print("📊 Getting brand performance...")
-        
-        query = """
-        SELECT 
-            p.brand,
-            COALESCE(SUM(si.quantity * si.unit_price), 0) as sales,
-            COALESCE(SUM(si.quantity), 0) as units,
-            COALESCE(SUM(si.quantity * (si.unit_price - p.purchase_price)), 0) as profit
-        FROM products p
-        LEFT JOIN sale_items si ON p.id = si.product_id
-        LEFT JOIN sales s ON si.sale_id = s.id
-        GROUP BY p.brand
-        HAVING COALESCE(SUM(si.quantity), 0) > 0
-        ORDER BY sales DESC
-        LIMIT 10
-        """
-        
-        result = db.session.execute(db.text(query))
-        brands = []
-        
-        for row in result:
-            brands.append({
-                'brand': row.brand,
-                'sales': float(row.sales),
-                'units': int(row.units),
-                'profit': float(row.profit)
-            })
+        filters = analytics.parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    try:
+        logger.debug("Getting brand performance")
         
         return jsonify({
             'success': True,
-            'brands': brands
+            'brands': analytics.brand_performance(**filters)
         }), 200
         
     except Exception as e:
-        print(f"❌ Error getting brand performance: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'success': False, 'message': str(e)}), 500
\ No newline at end of file
+        logger.exception("Error getting brand performance")
+        return jsonify({'success': False, 'message': str(e)}), 500
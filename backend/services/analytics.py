@@ -0,0 +1,404 @@
+from datetime import date, timedelta
+from models import db
+from models.sale import Sale, SaleItem
+from models.inventory import InventoryItem
+from models.product import Product
+from models.rollup import SalesDailyRollup, SalesHourlyRollup
+from services.clock import business_today, business_timestamp
+
+CATEGORY_COLORS = ['#0088FE', '#00C49F', '#FFBB28', '#FF8042', '#8884D8', '#82ca9d']
+
+
+def _shift_month(month_start, offset):
+    """Return the first day of the month `offset` months away from `month_start`"""
+    index = month_start.year * 12 + (month_start.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+FILTER_ARGS = ('sale_type', 'payment_method', 'brand', 'category')
+
+
+def _parse_date(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' date, expected YYYY-MM-DD")
+
+
+def parse_date_range(args):
+    """from/to query parameters as inclusive business dates. Raises ValueError."""
+    date_from, date_to = _parse_date(args, 'from'), _parse_date(args, 'to')
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("'from' must not be after 'to'")
+    return {'date_from': date_from, 'date_to': date_to}
+
+
+def parse_filters(args):
+    """
+    Shared analytics query parameters: from/to (inclusive YYYY-MM-DD business
+    dates), sale_type, payment_method, brand and category. Raises ValueError.
+    """
+    filters = parse_date_range(args)
+    for name in FILTER_ARGS:
+        filters[name] = args.get(name) or None
+    return filters
+
+
+def sales_lines(date_from=None, date_to=None, sale_type=None, payment_method=None, brand=None, category=None):
+    """
+    Subquery of (product_id, brand, category, units, revenue, cost) rows matching
+    the filters, using the brand, category and unit cost captured at sale time.
+    Reads the daily rollup unless a sale-level dimension is requested, then
+    falls back to sale_items/sales filtered on sales.business_date.
+    """
+    if sale_type or payment_method:
+        query = db.session.query(
+            SaleItem.product_id.label('product_id'),
+            SaleItem.product_brand.label('brand'),
+            SaleItem.product_category.label('category'),
+            SaleItem.quantity.label('units'),
+            (SaleItem.quantity * SaleItem.unit_price).label('revenue'),
+            (SaleItem.quantity * SaleItem.unit_cost).label('cost')
+        ).join(Sale, SaleItem.sale_id == Sale.id)
+
+        if date_from:
+            query = query.filter(Sale.business_date >= date_from)
+        if date_to:
+            query = query.filter(Sale.business_date <= date_to)
+        if sale_type:
+            query = query.filter(Sale.sale_type == sale_type)
+        if payment_method:
+            query = query.filter(Sale.payment_method == payment_method)
+        if brand:
+            query = query.filter(SaleItem.product_brand == brand)
+        if category:
+            query = query.filter(SaleItem.product_category == category)
+    else:
+        query = db.session.query(
+            SalesDailyRollup.product_id.label('product_id'),
+            SalesDailyRollup.brand.label('brand'),
+            SalesDailyRollup.category.label('category'),
+            SalesDailyRollup.units.label('units'),
+            SalesDailyRollup.revenue.label('revenue'),
+            SalesDailyRollup.cost.label('cost')
+        )
+
+        if date_from:
+            query = query.filter(SalesDailyRollup.business_date >= date_from)
+        if date_to:
+            query = query.filter(SalesDailyRollup.business_date <= date_to)
+        if brand:
+            query = query.filter(SalesDailyRollup.brand == brand)
+        if category:
+            query = query.filter(SalesDailyRollup.category == category)
+
+    return query.subquery()
+
+
+def sales_overview():
+    total_sales = db.session.query(db.func.sum(SalesDailyRollup.revenue)).scalar() or 0
+    total_transactions = Sale.query.count()
+
+    today = business_today()
+    today_sales = db.session.query(db.func.sum(SalesDailyRollup.revenue)).filter(
+        SalesDailyRollup.business_date == today
+    ).scalar() or 0
+
+    return {
+        'total_sales': float(total_sales),
+        'total_transactions': total_transactions,
+        'today_sales': float(today_sales),
+        'average_sale': float(total_sales / total_transactions) if total_transactions > 0 else 0
+    }
+
+
+def sales_trend(days=7):
+    today = business_today()
+    range_start = today - timedelta(days=days - 1)
+
+    daily_sales = dict(db.session.query(
+        SalesDailyRollup.business_date,
+        db.func.sum(SalesDailyRollup.revenue)
+    ).filter(
+        SalesDailyRollup.business_date >= range_start,
+        SalesDailyRollup.business_date <= today
+    ).group_by(SalesDailyRollup.business_date).all())
+
+    daily_transactions = dict(db.session.query(
+        Sale.business_date,
+        db.func.count(Sale.id)
+    ).filter(
+        Sale.business_date >= range_start,
+        Sale.business_date <= today
+    ).group_by(Sale.business_date).all())
+
+    trend_data = []
+    for i in range(days - 1, -1, -1):
+        day = today - timedelta(days=i)
+        trend_data.append({
+            'name': day.strftime('%a'),
+            'sales': float(daily_sales.get(day) or 0),
+            'transactions': int(daily_transactions.get(day) or 0),
+            'date': day.isoformat()
+        })
+    return trend_data
+
+
+WEEKDAYS = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+
+
+def sales_heatmap(date_from=None, date_to=None, rollup_after_days=62):
+    """
+    Transactions and revenue as weekday x hour (7 x 24, Sunday first) matrices
+    in shop-local time, from one grouped query. Ranges longer than
+    `rollup_after_days` (or open-ended) read the hourly rollup instead of sales.
+    """
+    if date_from is None or date_to is None or (date_to - date_from).days >= rollup_after_days:
+        weekday = db.extract('dow', SalesHourlyRollup.business_date)
+        hour = SalesHourlyRollup.hour
+        query = db.session.query(
+            weekday, hour,
+            db.func.sum(SalesHourlyRollup.transactions),
+            db.func.sum(SalesHourlyRollup.revenue)
+        )
+        business_date = SalesHourlyRollup.business_date
+    else:
+        local_time = business_timestamp(Sale.created_at)
+        weekday = db.extract('dow', local_time)
+        hour = db.extract('hour', local_time)
+        query = db.session.query(
+            weekday, hour,
+            db.func.count(Sale.id),
+            db.func.sum(Sale.total_amount)
+        )
+        business_date = Sale.business_date
+
+    if date_from:
+        query = query.filter(business_date >= date_from)
+    if date_to:
+        query = query.filter(business_date <= date_to)
+
+    transactions = [[0] * 24 for _ in WEEKDAYS]
+    revenue = [[0.0] * 24 for _ in WEEKDAYS]
+    for day, hour_of_day, count, total in query.group_by(weekday, hour).all():
+        transactions[int(day)][int(hour_of_day)] = int(count)
+        revenue[int(day)][int(hour_of_day)] = float(total or 0)
+
+    return {'weekdays': WEEKDAYS, 'transactions': transactions, 'revenue': revenue}
+
+
+PRODUCT_SORTS = ('units', 'revenue', 'profit')
+
+
+def product_performance(limit=20, sort='units', **filters):
+    """Top products by units, revenue or profit with current stock, in one statement"""
+    lines = sales_lines(**filters)
+    stock = stock_levels()
+    units_sold = db.func.sum(lines.c.units)
+    revenue = db.func.sum(lines.c.revenue)
+    actual_profit = db.func.sum(lines.c.revenue - lines.c.cost)
+    current_stock = db.func.coalesce(stock.c.stock, 0)
+
+    order_by = {'units': units_sold, 'revenue': revenue, 'profit': actual_profit}[sort]
+    rows = db.session.query(
+        Product.id,
+        Product.name,
+        Product.brand,
+        units_sold.label('units_sold'),
+        revenue.label('revenue'),
+        actual_profit.label('actual_profit'),
+        current_stock.label('stock')
+    ).join(
+        lines, lines.c.product_id == Product.id
+    ).outerjoin(
+        stock, stock.c.product_id == Product.id
+    ).group_by(
+        Product.id, Product.name, Product.brand, stock.c.stock
+    ).having(units_sold > 0).order_by(order_by.desc(), Product.id).limit(limit).all()
+
+    return [
+        {
+            'id': row.id,
+            'name': row.name,
+            'brand': row.brand,
+            'units_sold': int(row.units_sold),
+            'revenue': float(row.revenue),
+            'actual_profit': float(row.actual_profit),
+            'stock': int(row.stock),
+            'profit_margin': round((row.actual_profit / row.revenue * 100), 2) if row.revenue > 0 else 0
+        }
+        for row in rows
+    ]
+
+
+def monthly_trend(months=6):
+    current_month = business_today().replace(day=1)
+    range_start = _shift_month(current_month, -(months - 1))
+    range_end = _shift_month(current_month, 1)
+
+    # One grouped query over a half-open business_date range of the rollup
+    year_col = db.extract('year', SalesDailyRollup.business_date)
+    month_col = db.extract('month', SalesDailyRollup.business_date)
+    rows = db.session.query(
+        year_col.label('year'),
+        month_col.label('month'),
+        db.func.sum(SalesDailyRollup.revenue).label('revenue'),
+        db.func.sum(SalesDailyRollup.revenue - SalesDailyRollup.cost).label('actual_profit')
+    ).filter(
+        SalesDailyRollup.business_date >= range_start,
+        SalesDailyRollup.business_date < range_end
+    ).group_by(year_col, month_col).all()
+
+    totals = {(int(row.year), int(row.month)): row for row in rows}
+
+    monthly_data = []
+    for i in range(months):
+        month_start = _shift_month(range_start, i)
+        row = totals.get((month_start.year, month_start.month))
+        revenue = float(row.revenue) if row and row.revenue else 0
+        actual_profit = float(row.actual_profit) if row and row.actual_profit else 0
+
+        monthly_data.append({
+            'month': month_start.strftime('%b'),
+            'year': month_start.year,
+            'period': month_start.strftime('%Y-%m'),
+            'revenue': revenue,
+            'profit': actual_profit,
+            'profit_margin': (actual_profit / revenue * 100) if revenue > 0 else 0
+        })
+    return monthly_data
+
+
+def profit_summary(**filters):
+    lines = sales_lines(**filters)
+    result = db.session.query(
+        db.func.sum(lines.c.revenue).label('total_revenue'),
+        db.func.sum(lines.c.cost).label('total_cost')
+    ).one()
+
+    total_revenue = float(result.total_revenue) if result.total_revenue else 0
+    total_cost = float(result.total_cost) if result.total_cost else 0
+    total_profit = total_revenue - total_cost
+
+    return {
+        'total_revenue': total_revenue,
+        'total_cost': total_cost,
+        'total_profit': total_profit,
+        'profit_margin': (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+    }
+
+
+def category_performance(**filters):
+    lines = sales_lines(**filters)
+    revenue = db.func.sum(lines.c.revenue)
+    units_sold = db.func.sum(lines.c.units)
+    rows = db.session.query(
+        lines.c.category,
+        revenue.label('revenue'),
+        db.func.sum(lines.c.revenue - lines.c.cost).label('profit'),
+        units_sold.label('units_sold')
+    ).group_by(lines.c.category).having(units_sold > 0).order_by(revenue.desc()).all()
+
+    return [
+        {
+            'name': row.category,
+            'value': float(row.revenue),
+            'profit': float(row.profit),
+            'units_sold': int(row.units_sold),
+            'color': CATEGORY_COLORS[i % len(CATEGORY_COLORS)]
+        }
+        for i, row in enumerate(rows)
+    ]
+
+
+def brand_performance(limit=10, **filters):
+    lines = sales_lines(**filters)
+    sales = db.func.sum(lines.c.revenue)
+    units = db.func.sum(lines.c.units)
+    rows = db.session.query(
+        lines.c.brand,
+        sales.label('sales'),
+        units.label('units'),
+        db.func.sum(lines.c.revenue - lines.c.cost).label('profit')
+    ).group_by(lines.c.brand).having(units > 0).order_by(sales.desc()).limit(limit).all()
+
+    return [
+        {
+            'brand': row.brand,
+            'sales': float(row.sales),
+            'units': int(row.units),
+            'profit': float(row.profit)
+        }
+        for row in rows
+    ]
+
+
+def stock_levels():
+    """Grouped current-stock subquery (product_id, stock) over inventory_items"""
+    signed_quantity = db.case(
+        (InventoryItem.transaction_type == 'in', InventoryItem.quantity),
+        else_=-InventoryItem.quantity
+    )
+    return db.session.query(
+        InventoryItem.product_id.label('product_id'),
+        db.func.sum(signed_quantity).label('stock')
+    ).group_by(InventoryItem.product_id).subquery()
+
+
+def inventory_summary(low_stock_threshold=10):
+    """Product count, stock value and low-stock list in one pass over products"""
+    stock = stock_levels()
+    current_stock = db.func.coalesce(stock.c.stock, 0)
+    rows = db.session.query(
+        Product.id,
+        Product.name,
+        Product.brand,
+        Product.category,
+        Product.purchase_price,
+        current_stock.label('current_stock')
+    ).outerjoin(stock, stock.c.product_id == Product.id).all()
+
+    low_stock = [
+        {
+            'id': row.id,
+            'name': row.name,
+            'brand': row.brand,
+            'category': row.category,
+            'current_stock': int(row.current_stock)
+        }
+        for row in rows if row.current_stock < low_stock_threshold
+    ]
+    low_stock.sort(key=lambda product: product['current_stock'])
+
+    return {
+        'total_products': len(rows),
+        'inventory_value': float(sum(row.current_stock * row.purchase_price for row in rows)),
+        'low_stock_count': len(low_stock),
+        'low_stock': low_stock
+    }
+
+
+def recent_sales(limit=5):
+    item_counts = db.session.query(db.func.count(SaleItem.id)).filter(
+        SaleItem.sale_id == Sale.id
+    ).scalar_subquery()
+
+    rows = db.session.query(Sale, item_counts.label('items_count')).order_by(
+        Sale.created_at.desc()
+    ).limit(limit).all()
+
+    return [
+        {
+            'id': sale.id,
+            'invoice_number': sale.invoice_number,
+            'sale_type': sale.sale_type,
+            'total_amount': sale.total_amount,
+            'payment_method': sale.payment_method,
+            'created_at': sale.created_at.isoformat(),
+            'items_count': items_count
+        }
+        for sale, items_count in rows
+    ]
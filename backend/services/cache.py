@@ -0,0 +1,250 @@
+import fcntl
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, request, make_response, Response
+from services.metrics import CACHE_REQUESTS
+
+DATA_VERSION_KEY = 'data-version'
+RESPONSE_KEY_PREFIX = 'analytics:'
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """
+    Per-process dictionary store; each gunicorn worker keeps its own copy, so a
+    write only invalidates the worker that handled it. Holds at most
+    `max_entries` entries, evicting the least recently used.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at and expires_at < time.time():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl if ttl else None, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        # Counters live outside the LRU so they are never evicted
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            if key == DATA_VERSION_KEY:
+                # Responses cached under earlier versions can no longer be read
+                for stale in [k for k in self._entries if k.startswith(RESPONSE_KEY_PREFIX)]:
+                    del self._entries[stale]
+            return value
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class FileSystemBackend:
+    """
+    Store shared by every worker on the box through a cache directory. Expired
+    files are swept at most every `sweep_seconds`, from the cache-fill path.
+    """
+
+    def __init__(self, directory, sweep_seconds=300):
+        self.directory = directory
+        self.sweep_seconds = sweep_seconds
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as fh:
+                expires_at, value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at and expires_at < time.time():
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, 'wb') as fh:
+            pickle.dump((time.time() + ttl if ttl else None, value), fh)
+        os.replace(tmp_path, self._path(key))
+        if ttl:
+            self._sweep_if_due()
+
+    def incr(self, key):
+        with open(os.path.join(self.directory, 'incr.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            value = (self.get(key) or 0) + 1
+            self.set(key, value)
+        return value
+
+    def get_counter(self, key):
+        return self.get(key) or 0
+
+    def _sweep_if_due(self):
+        # The marker's mtime records the last sweep across all workers
+        marker = os.path.join(self.directory, 'sweep.marker')
+        now = time.time()
+        try:
+            if now - os.path.getmtime(marker) < self.sweep_seconds:
+                return
+        except OSError:
+            pass
+        with open(marker, 'a'):
+            os.utime(marker, (now, now))
+        self._remove_expired()
+
+    def _remove_expired(self):
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'rb') as fh:
+                    expires_at, _ = pickle.load(fh)
+                if expires_at and expires_at < now:
+                    os.remove(path)
+            except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+                continue
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name not in ('incr.lock', 'sweep.marker'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class RedisBackend:
+    """Store shared through a Redis-compatible server (requires the `redis` package)"""
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, pickle.dumps(value), ex=ttl)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def get_counter(self, key):
+        return int(self._client.get(key) or 0)
+
+    def clear(self):
+        self._client.flushdb()
+
+
+def init_cache(app):
+    """Create the analytics cache backend configured by ANALYTICS_CACHE_BACKEND"""
+    backend = app.config.get('ANALYTICS_CACHE_BACKEND', 'memory')
+
+    if backend == 'memory':
+        cache = MemoryBackend(app.config['ANALYTICS_CACHE_MAX_ENTRIES'])
+    elif backend == 'filesystem':
+        cache = FileSystemBackend(app.config['ANALYTICS_CACHE_DIR'], app.config.get('ANALYTICS_CACHE_TTL') or 300)
+    elif backend == 'redis':
+        cache = RedisBackend(app.config['ANALYTICS_CACHE_REDIS_URL'])
+    elif backend in ('none', '', None):
+        cache = None
+    else:
+        raise ValueError(f"Unknown ANALYTICS_CACHE_BACKEND: {backend}")
+
+    app.extensions['analytics_cache'] = cache
+    return cache
+
+
+def get_cache():
+    return current_app.extensions.get('analytics_cache')
+
+
+def bump_data_version():
+    """
+    Invalidate every cached analytics response; call after committing a write.
+    A cache failure is logged rather than raised, since the write already stands.
+    """
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except Exception:
+        logger.exception("Invalidating the analytics cache failed; responses may be stale until they expire")
+
+
+def _cache_key(version):
+    args = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    return f"{RESPONSE_KEY_PREFIX}{version}:{request.endpoint}:{args}"
+
+
+def cached_response(view):
+    """
+    Serve a GET view from the analytics cache, keyed by endpoint and query
+    string under the current data version, with ETag / 304 support.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = get_cache()
+        entry = None
+
+        if cache is not None:
+            key = _cache_key(cache.get_counter(DATA_VERSION_KEY))
+            entry = cache.get(key)
+            CACHE_REQUESTS.labels('miss' if entry is None else 'hit').inc()
+
+        if entry is None:
+            # A response stored for this version must not come from a lagging replica
+            g.filling_cache = cache is not None
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+            body = response.get_data()
+            entry = {
+                'body': body,
+                'mimetype': response.mimetype,
+                'etag': hashlib.sha1(body).hexdigest()
+            }
+            if cache is not None:
+                cache.set(key, entry, current_app.config.get('ANALYTICS_CACHE_TTL'))
+
+        response = Response(entry['body'], mimetype=entry['mimetype'])
+        response.set_etag(entry['etag'])
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response.make_conditional(request)
+
+    return wrapper
@@ -0,0 +1,182 @@
+import numpy as np
+from datetime import datetime, timedelta
+from models import db
+from models.classification import ProductClassification
+from models.inventory import InventoryItem
+from models.product import Product
+from models.sale import Sale, SaleItem
+from services.clock import business_today
+
+# Cumulative revenue share reached *before* a product decides its ABC class
+ABC_LIMITS = (0.80, 0.95)
+# Coefficient of variation of weekly units sold decides the XYZ class
+XYZ_LIMITS = (0.5, 1.0)
+
+
+def _weekly_sales(period_start, weeks):
+    """(product_ids, units products x weeks, revenue per product) from one sale_items query"""
+    rows = db.session.query(
+        SaleItem.product_id,
+        Sale.business_date,
+        db.func.sum(SaleItem.quantity),
+        db.func.sum(SaleItem.quantity * SaleItem.unit_price)
+    ).join(Sale, SaleItem.sale_id == Sale.id).filter(
+        Sale.business_date >= period_start,
+        Sale.business_date < period_start + timedelta(weeks=weeks)
+    ).group_by(SaleItem.product_id, Sale.business_date).all()
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.zeros((0, weeks)), np.zeros(0)
+
+    product_col, date_col, units_col, revenue_col = zip(*rows)
+    product_ids, product_index = np.unique(np.array(product_col, dtype=np.int64), return_inverse=True)
+    week_index = (np.array(date_col, dtype='datetime64[D]') - np.datetime64(period_start, 'D')).astype(np.int64) // 7
+
+    units = np.zeros((len(product_ids), weeks))
+    np.add.at(units, (product_index, week_index), np.array(units_col, dtype=np.float64))
+    revenue = np.bincount(product_index, weights=np.array(revenue_col, dtype=np.float64), minlength=len(product_ids))
+    return product_ids, units, revenue
+
+
+def _stock_on_hand():
+    """(product_ids, stock) for every product with inventory movements, from one inventory_items query"""
+    signed_quantity = db.case(
+        (InventoryItem.transaction_type == 'in', InventoryItem.quantity),
+        else_=-InventoryItem.quantity
+    )
+    rows = db.session.query(
+        InventoryItem.product_id,
+        db.func.sum(signed_quantity)
+    ).group_by(InventoryItem.product_id).all()
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.zeros(0)
+
+    product_col, stock_col = zip(*rows)
+    return np.array(product_col, dtype=np.int64), np.maximum(np.array(stock_col, dtype=np.float64), 0)
+
+
+def _align(product_ids, source_ids, values, fill=0.0):
+    """Reindex `values` keyed by `source_ids` onto the sorted `product_ids`"""
+    aligned = np.full((len(product_ids),) + values.shape[1:], fill, dtype=np.float64)
+    aligned[np.searchsorted(product_ids, source_ids)] = values
+    return aligned
+
+
+def classify(revenue, weekly_units, stock):
+    """
+    ABC/XYZ classes plus sell-through and weeks of supply for aligned per-product
+    arrays. Returns a dict of arrays; undefined ratios are NaN.
+    """
+    weeks = weekly_units.shape[1]
+    total_revenue = revenue.sum()
+
+    order = np.argsort(-revenue, kind='stable')
+    share = revenue / total_revenue if total_revenue > 0 else np.zeros_like(revenue)
+    cumulative = np.empty_like(share)
+    cumulative[order] = np.cumsum(share[order])
+    share_before = cumulative - share
+    abc = np.where(share_before < ABC_LIMITS[0], 'A', np.where(share_before < ABC_LIMITS[1], 'B', 'C'))
+    abc[revenue <= 0] = 'C'
+
+    units_sold = weekly_units.sum(axis=1)
+    mean_weekly = units_sold / weeks
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.where(mean_weekly > 0, weekly_units.std(axis=1) / mean_weekly, np.nan)
+        sell_through = np.where(units_sold + stock > 0, units_sold / (units_sold + stock), np.nan)
+        weeks_of_supply = np.where(mean_weekly > 0, stock / mean_weekly, np.nan)
+    xyz = np.where(cv <= XYZ_LIMITS[0], 'X', np.where(cv <= XYZ_LIMITS[1], 'Y', 'Z'))
+
+    return {
+        'abc_class': abc,
+        'xyz_class': xyz,
+        'revenue_share': share,
+        'cumulative_share': cumulative,
+        'units_sold': units_sold,
+        'demand_cv': cv,
+        'sell_through_rate': sell_through,
+        'weeks_of_supply': weeks_of_supply
+    }
+
+
+def _optional(value, digits=4):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def refresh_classifications(weeks=13):
+    """
+    Reclassify every product that sold in the last `weeks` full weeks or holds
+    stock, replacing the product_classifications table; returns the row count.
+    """
+    period_end = business_today()
+    period_start = period_end - timedelta(weeks=weeks) + timedelta(days=1)
+
+    sold_ids, weekly_units, revenue = _weekly_sales(period_start, weeks)
+    stock_ids, stock = _stock_on_hand()
+    product_ids = np.union1d(sold_ids, stock_ids)
+
+    revenue = _align(product_ids, sold_ids, revenue)
+    weekly_units = _align(product_ids, sold_ids, weekly_units)
+    stock = _align(product_ids, stock_ids, stock)
+    result = classify(revenue, weekly_units, stock)
+
+    computed_at = datetime.utcnow()
+    rows = [
+        {
+            'product_id': product_id,
+            'abc_class': str(result['abc_class'][i]),
+            'xyz_class': str(result['xyz_class'][i]),
+            'revenue': float(revenue[i]),
+            'revenue_share': round(float(result['revenue_share'][i]), 6),
+            'cumulative_share': round(float(result['cumulative_share'][i]), 6),
+            'units_sold': int(result['units_sold'][i]),
+            'demand_cv': _optional(result['demand_cv'][i]),
+            'sell_through_rate': _optional(result['sell_through_rate'][i]),
+            'weeks_of_supply': _optional(result['weeks_of_supply'][i], 1),
+            'stock': int(stock[i]),
+            'period_start': period_start,
+            'period_end': period_end,
+            'computed_at': computed_at
+        }
+        for i, product_id in enumerate(product_ids.tolist())
+    ]
+
+    db.session.query(ProductClassification).delete()
+    for start in range(0, len(rows), 5000):
+        db.session.execute(ProductClassification.__table__.insert(), rows[start:start + 5000])
+    db.session.commit()
+    return len(rows)
+
+
+CLASSIFICATION_SORTS = {
+    'revenue': ProductClassification.revenue.desc().nulls_last(),
+    'units': ProductClassification.units_sold.desc().nulls_last(),
+    'sell_through': ProductClassification.sell_through_rate.desc().nulls_last(),
+    'weeks_of_supply': ProductClassification.weeks_of_supply.desc().nulls_last(),
+    'demand_cv': ProductClassification.demand_cv.desc().nulls_last()
+}
+
+
+def classification_page(page=1, per_page=50, sort='revenue', abc_class=None, xyz_class=None, brand=None, category=None):
+    """One page of stored classifications with their products, filtered by class and product dimensions"""
+    query = ProductClassification.query.join(Product).options(db.contains_eager(ProductClassification.product))
+    if abc_class:
+        query = query.filter(ProductClassification.abc_class == abc_class)
+    if xyz_class:
+        query = query.filter(ProductClassification.xyz_class == xyz_class)
+    if brand:
+        query = query.filter(Product.brand == brand)
+    if category:
+        query = query.filter(Product.category == category)
+
+    pagination = query.order_by(
+        CLASSIFICATION_SORTS[sort], ProductClassification.product_id
+    ).paginate(page=page, per_page=per_page, error_out=False)
+
+    return {
+        'items': [row.to_dict() for row in pagination.items],
+        'total': pagination.total,
+        'page': pagination.page,
+        'per_page': pagination.per_page,
+        'pages': pagination.pages
+    }
@@ -0,0 +1,54 @@
+import pytz
+from datetime import datetime
+from flask import current_app, has_app_context
+from models import db
+
+DEFAULT_SHOP_TIMEZONE = 'Africa/Nairobi'
+
+
+def shop_timezone():
+    """Timezone that defines the shop's business day (SHOP_TIMEZONE)"""
+    name = DEFAULT_SHOP_TIMEZONE
+    if has_app_context():
+        name = current_app.config.get('SHOP_TIMEZONE', DEFAULT_SHOP_TIMEZONE)
+    return pytz.timezone(name)
+
+
+def business_now():
+    return datetime.now(shop_timezone())
+
+
+def business_today():
+    return business_now().date()
+
+
+def business_datetime_for(created_at):
+    """Shop-local datetime of a naive UTC timestamp"""
+    return pytz.utc.localize(created_at).astimezone(shop_timezone())
+
+
+def business_date_for(created_at):
+    """Shop-local calendar date of a naive UTC timestamp"""
+    return business_datetime_for(created_at).date()
+
+
+def business_timestamp(column):
+    """
+    SQL expression converting a naive UTC timestamp column to shop-local time.
+    Postgres converts per row; other databases shift by the zone's current UTC
+    offset, which is exact for zones without daylight saving such as Nairobi.
+    """
+    timezone = shop_timezone()
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return db.func.timezone(timezone.zone, db.func.timezone('UTC', column))
+
+    offset_minutes = int(business_now().utcoffset().total_seconds() // 60)
+    return db.func.datetime(column, f'{offset_minutes:+d} minutes')
+
+
+def stamp_business_date(mapper, connection, target):
+    """before_insert hook: fill created_at (UTC) and the matching business_date"""
+    if target.created_at is None:
+        target.created_at = datetime.utcnow()
+    if target.business_date is None:
+        target.business_date = business_date_for(target.created_at)
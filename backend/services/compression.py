@@ -0,0 +1,61 @@
+import gzip
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/csv', 'text/plain', 'text/html', 'text/css', 'application/javascript'
+}
+
+
+def _encoding():
+    """The best encoding the client accepts: br (when brotli is installed), gzip, or None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """
+    after_request stage: gzip/brotli-compress buffered text and JSON bodies of
+    at least COMPRESS_MIN_BYTES when the client accepts it. Streamed responses
+    (exports, event streams, files) are left alone.
+    """
+    config = current_app.config
+    if (
+        not config.get('COMPRESS_ENABLED', True)
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < config.get('COMPRESS_MIN_BYTES', 1024):
+        return response
+
+    encoding = _encoding()
+    if encoding == 'br':
+        body = brotli.compress(body, quality=config.get('COMPRESS_BROTLI_QUALITY', 4))
+    elif encoding == 'gzip':
+        body = gzip.compress(body, compresslevel=config.get('COMPRESS_GZIP_LEVEL', 5))
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag names the identity bytes; weak ones still match If-None-Match
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,129 @@
+import logging
+import os
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from models import RoutingSession, db
+
+logger = logging.getLogger(__name__)
+
+
+def pool_layout(config):
+    """
+    Connections per process for the web and job workers sharing DB_MAX_CONNECTIONS.
+    DB_POOL_SIZE defaults to one per request thread plus the dashboard widget
+    threads; DB_MAX_OVERFLOW defaults to the rest of the per-process share.
+    """
+    processes = config['WEB_CONCURRENCY'] + config['JOBS_WORKERS']
+    # Each web worker holds one extra connection for LISTEN when events go through Postgres
+    listeners = config['WEB_CONCURRENCY'] if config['EVENTS_BACKEND'] == 'postgres' else 0
+    per_process = (config['DB_MAX_CONNECTIONS'] - listeners) // processes
+
+    pool_size = config['DB_POOL_SIZE']
+    if pool_size is None:
+        pool_size = max(1, min(config['GUNICORN_THREADS'] + config['DASHBOARD_MAX_WORKERS'], per_process))
+    max_overflow = config['DB_MAX_OVERFLOW']
+    if max_overflow is None:
+        max_overflow = max(0, per_process - pool_size)
+
+    return {
+        'processes': processes,
+        'listeners': listeners,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'total': processes * (pool_size + max_overflow) + listeners,
+        'budget': config['DB_MAX_CONNECTIONS']
+    }
+
+
+def configure_engine(app):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS (for the primary and any replica bind)
+    from the DB_* settings, refusing layouts that exceed DB_MAX_CONNECTIONS.
+    Must run before db.init_app.
+    """
+    config = app.config
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+
+    for name in ('DB_STATEMENT_TIMEOUT_MS', 'DB_REPORT_STATEMENT_TIMEOUT_MS', 'DB_BACKGROUND_STATEMENT_TIMEOUT_MS'):
+        if config[name] < 0:
+            raise ValueError(f"{name} must be 0 (no timeout) or a number of milliseconds")
+
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+
+    if url.get_backend_name() == 'sqlite':
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        logger.info("Database pool: sqlite, default pool")
+        return options
+
+    layout = pool_layout(config)
+    if layout['pool_size'] < 1 or layout['total'] > layout['budget']:
+        raise ValueError(
+            f"Database pool needs {layout['total']} connections "
+            f"({layout['processes']} processes x (pool_size {layout['pool_size']} + overflow {layout['max_overflow']})"
+            f" + {layout['listeners']} listeners) but DB_MAX_CONNECTIONS is {layout['budget']}"
+        )
+
+    options.setdefault('pool_size', layout['pool_size'])
+    options.setdefault('max_overflow', layout['max_overflow'])
+    options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+
+    if config['DB_PGBOUNCER']:
+        # Transaction pooling hands each transaction to any server connection:
+        # no startup options or session-level SET; timeouts are SET LOCAL per transaction
+        if config['EVENTS_BACKEND'] == 'postgres':
+            logger.warning("EVENTS_BACKEND=postgres needs LISTEN on a session; PgBouncer transaction mode will not deliver events")
+    elif config['DB_STATEMENT_TIMEOUT_MS']:
+        connect_args = dict(options.get('connect_args') or {})
+        connect_args.setdefault('options', f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}")
+        options['connect_args'] = connect_args
+
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    logger.info(
+        "Database pool: %d processes x (pool_size %d + overflow %d) + %d listeners = %d of %d connections; "
+        "statement timeouts %dms requests, %dms reports, %dms background%s",
+        layout['processes'], layout['pool_size'], layout['max_overflow'], layout['listeners'],
+        layout['total'], layout['budget'], config['DB_STATEMENT_TIMEOUT_MS'],
+        config['DB_REPORT_STATEMENT_TIMEOUT_MS'], config['DB_BACKGROUND_STATEMENT_TIMEOUT_MS'],
+        ' (PgBouncer transaction mode)' if config['DB_PGBOUNCER'] else ''
+    )
+    return options
+
+
+def dispose_engines_after_fork(app):
+    """
+    Give every forked child (gunicorn --preload workers, the job pool) its own
+    connection pools; connections opened before the fork stay with the parent.
+    Must run after db.init_app.
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def dispose():
+        for engine in engines:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=dispose)
+
+
+def statement_timeout():
+    """Timeout for the current context: report reads, other requests, or CLI/job work"""
+    config = current_app.config
+    if g.get('db_role') == 'reports':
+        return config['DB_REPORT_STATEMENT_TIMEOUT_MS']
+    if has_request_context():
+        return config['DB_STATEMENT_TIMEOUT_MS']
+    return config['DB_BACKGROUND_STATEMENT_TIMEOUT_MS']
+
+
+@event.listens_for(RoutingSession, 'after_begin')
+def _set_statement_timeout(session, transaction, connection):
+    if not has_app_context() or connection.dialect.name != 'postgresql':
+        return
+    config = current_app.config
+    timeout = statement_timeout()
+    # Outside PgBouncer mode the connection already defaults to the request timeout
+    if config['DB_PGBOUNCER'] or timeout != config['DB_STATEMENT_TIMEOUT_MS']:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
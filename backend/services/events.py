@@ -0,0 +1,158 @@
+import json
+import logging
+import queue
+import select
+import threading
+from functools import wraps
+from flask import current_app
+from models import db
+from models.inventory import InventoryItem
+from models.product import Product
+
+EVENTS_CHANNEL = 'smartshoe_events'
+
+logger = logging.getLogger(__name__)
+
+
+class EventBroker:
+    """Fans published events out to the SSE streams open in this process"""
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A stalled client misses events rather than blocking writers
+                pass
+
+
+broker = EventBroker()
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _listen_forever(database_uri):
+    """Relay Postgres NOTIFY payloads from any worker to local subscribers"""
+    import psycopg2
+    import psycopg2.extensions
+    from sqlalchemy.engine import make_url
+
+    dsn = make_url(database_uri).set(drivername='postgresql').render_as_string(hide_password=False)
+    connection = psycopg2.connect(dsn)
+    connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {EVENTS_CHANNEL}")
+
+    while True:
+        if select.select([connection], [], [], 60) == ([], [], []):
+            continue
+        connection.poll()
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            broker.dispatch(json.loads(notify.payload))
+
+
+def _ensure_listener(app):
+    # Started lazily so the thread is created inside each worker, after fork
+    global _listener
+    if app.config['EVENTS_BACKEND'] != 'postgres':
+        return
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(
+                target=_listen_forever,
+                args=(app.config['SQLALCHEMY_DATABASE_URI'],),
+                name='events-listener',
+                daemon=True
+            )
+            _listener.start()
+
+
+def subscribe():
+    _ensure_listener(current_app)
+    return broker.subscribe()
+
+
+def unsubscribe(subscriber):
+    broker.unsubscribe(subscriber)
+
+
+def _after_commit(publisher):
+    """
+    Publishers run after the write is committed: a failure (e.g. pg_notify over
+    its 8000-byte payload limit or a dropped connection) is logged and never
+    turns the write's response into an error a client would retry.
+    """
+    @wraps(publisher)
+    def wrapper(*args, **kwargs):
+        try:
+            publisher(*args, **kwargs)
+        except Exception:
+            db.session.rollback()
+            logger.exception("%s failed after commit; the change stands", publisher.__name__)
+    return wrapper
+
+
+def _publish_all(events):
+    if not events:
+        return
+
+    if current_app.config['EVENTS_BACKEND'] == 'postgres':
+        for event in events:
+            db.session.execute(
+                db.text("SELECT pg_notify(:channel, :payload)"),
+                {'channel': EVENTS_CHANNEL, 'payload': json.dumps(event)}
+            )
+        db.session.commit()
+    else:
+        for event in events:
+            broker.dispatch(event)
+
+
+@_after_commit
+def publish(event_type, data):
+    """Publish an event to every open stream; call after the change is committed"""
+    _publish_all([{'type': event_type, 'data': data}])
+
+
+@_after_commit
+def publish_stock_changes(product_ids):
+    """Publish stock-changed for each product, plus low-stock where it applies"""
+    signed_quantity = db.case(
+        (InventoryItem.transaction_type == 'in', InventoryItem.quantity),
+        else_=-InventoryItem.quantity
+    )
+    rows = db.session.query(
+        Product.id,
+        Product.name,
+        db.func.coalesce(db.func.sum(signed_quantity), 0).label('stock')
+    ).outerjoin(
+        InventoryItem, InventoryItem.product_id == Product.id
+    ).filter(Product.id.in_(set(product_ids))).group_by(Product.id, Product.name).all()
+
+    threshold = current_app.config['LOW_STOCK_THRESHOLD']
+    events = []
+    for row in rows:
+        data = {'product_id': row.id, 'name': row.name, 'stock': int(row.stock)}
+        events.append({'type': 'stock-changed', 'data': data})
+        if row.stock < threshold:
+            events.append({'type': 'low-stock', 'data': {**data, 'threshold': threshold}})
+    _publish_all(events)
@@ -0,0 +1,105 @@
+import csv
+import io
+import os
+import tempfile
+from models import db
+from models.product import Product
+from models.sale import Sale, SaleItem
+
+EXPORT_COLUMNS = [
+    'sale_id', 'invoice_number', 'created_at', 'business_date', 'sale_type', 'payment_method',
+    'product_id', 'sku', 'product_name', 'brand', 'category',
+    'quantity', 'unit_price', 'unit_cost', 'line_total', 'line_cost'
+]
+
+CHUNK_SIZE = 64 * 1024
+
+
+def sale_lines(date_from=None, date_to=None, batch_size=1000):
+    """
+    Every sale line in the business-date range, oldest first, read through a
+    server-side cursor `batch_size` rows at a time.
+    """
+    statement = db.select(
+        Sale.id,
+        Sale.invoice_number,
+        Sale.created_at,
+        Sale.business_date,
+        Sale.sale_type,
+        Sale.payment_method,
+        SaleItem.product_id,
+        Product.sku,
+        db.func.coalesce(SaleItem.product_name, Product.name),
+        db.func.coalesce(SaleItem.product_brand, Product.brand),
+        db.func.coalesce(SaleItem.product_category, Product.category),
+        SaleItem.quantity,
+        SaleItem.unit_price,
+        SaleItem.unit_cost,
+        SaleItem.quantity * SaleItem.unit_price,
+        SaleItem.quantity * SaleItem.unit_cost
+    ).join(
+        SaleItem, SaleItem.sale_id == Sale.id
+    ).outerjoin(
+        Product, Product.id == SaleItem.product_id
+    ).order_by(Sale.created_at, Sale.id, SaleItem.id)
+
+    if date_from:
+        statement = statement.filter(Sale.business_date >= date_from)
+    if date_to:
+        statement = statement.filter(Sale.business_date <= date_to)
+
+    result = db.session.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+
+def csv_chunks(rows):
+    """Encode rows as CSV (header first), yielding roughly CHUNK_SIZE byte chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_chunks(rows):
+    """
+    Write rows to a constant-memory XLSX workbook in a temporary file, then
+    stream the file back; only one worksheet row is held in memory at a time.
+    """
+    import xlsxwriter
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'tmpdir': tempfile.gettempdir()})
+        worksheet = workbook.add_worksheet('Sales')
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+
+        worksheet.write_row(0, 0, EXPORT_COLUMNS)
+        for row_number, row in enumerate(rows, start=1):
+            # constant_memory requires each row to be written left to right once
+            worksheet.write_number(row_number, 0, row[0])
+            worksheet.write(row_number, 1, row[1])
+            worksheet.write_datetime(row_number, 2, row[2], datetime_format)
+            worksheet.write(row_number, 3, row[3], date_format)
+            worksheet.write_row(row_number, 4, row[4:])
+        workbook.close()
+
+        with open(path, 'rb') as workbook_file:
+            while True:
+                chunk = workbook_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
@@ -0,0 +1,187 @@
+import logging
+import os
+import signal
+import socket
+import time
+from datetime import datetime
+from flask import current_app, g
+from models import db
+from models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = {}
+JOB_VALIDATORS = {}
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+def job_type(name, validate=None):
+    """
+    Register `handler(params, job)` for `name`; it returns {'result': ...} and/or
+    {'file', 'filename', 'mimetype'}. `validate(params)` raises ValueError at enqueue time.
+    """
+    def register(handler):
+        JOB_TYPES[name] = handler
+        if validate:
+            JOB_VALIDATORS[name] = validate
+        return handler
+    return register
+
+
+def _validate_export(params):
+    from services.analytics import parse_date_range
+
+    parse_date_range(params)
+    if params.get('format', 'csv') not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format '{params['format']}', expected csv or xlsx")
+
+
+def _result_path(job, extension):
+    directory = current_app.config['JOBS_RESULT_DIR']
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'job-{job.id}.{extension}')
+
+
+@job_type('export-sales', validate=_validate_export)
+def _export_sales(params, job):
+    from services.analytics import parse_date_range
+    from services.export import sale_lines, csv_chunks, xlsx_chunks
+    from services.replica import use_replica
+
+    use_replica()
+    date_range = parse_date_range(params)
+    export_format = params.get('format', 'csv')
+    encode = {'csv': csv_chunks, 'xlsx': xlsx_chunks}[export_format]
+
+    path = _result_path(job, export_format)
+    with open(path, 'wb') as output:
+        for chunk in encode(sale_lines(**date_range)):
+            output.write(chunk)
+
+    period = '_'.join(str(date_range[name] or 'all') for name in ('date_from', 'date_to'))
+    mimetype = 'text/csv' if export_format == 'csv' else \
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    return {'file': path, 'filename': f'sales_{period}.{export_format}', 'mimetype': mimetype}
+
+
+@job_type('reorder-suggestions')
+def _reorder_suggestions(params, job):
+    from services.reorder import reorder_suggestions
+    from services.replica import use_replica
+
+    use_replica()
+    config = current_app.config
+    return {'result': reorder_suggestions(
+        history_days=int(params.get('history_days', config['REORDER_HISTORY_DAYS'])),
+        lead_time_days=int(params.get('lead_time', config['REORDER_LEAD_TIME_DAYS'])),
+        cover_days=int(params.get('cover_days', config['REORDER_COVER_DAYS'])),
+        limit=int(params.get('limit', 1000))
+    )}
+
+
+@job_type('rebuild-rollup')
+def _rebuild_rollup(params, job):
+    from services.cache import bump_data_version
+    from services.rollup import rebuild_rollup
+
+    rows = rebuild_rollup()
+    bump_data_version()
+    return {'result': {'rows': rows}}
+
+
+@job_type('classify-products')
+def _classify_products(params, job):
+    from services.cache import bump_data_version
+    from services.classification import refresh_classifications
+
+    rows = refresh_classifications(int(params.get('weeks', 13)))
+    bump_data_version()
+    return {'result': {'rows': rows}}
+
+
+def enqueue(job_type_name, params=None, user_id=None):
+    """Queue a job for the `flask run-jobs` workers; raises ValueError for an unknown type"""
+    if job_type_name not in JOB_TYPES:
+        raise ValueError(f"Unknown job type '{job_type_name}', expected one of {', '.join(JOB_TYPES)}")
+    params = params or {}
+    if not isinstance(params, dict):
+        raise ValueError("'params' must be an object")
+    if job_type_name in JOB_VALIDATORS:
+        JOB_VALIDATORS[job_type_name](params)
+
+    job = Job(job_type=job_type_name, params=params, user_id=user_id)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def claim_next(worker_name):
+    """Atomically move the oldest queued job to running; returns it or None"""
+    candidate = db.session.query(Job.id).filter(Job.status == 'queued').order_by(
+        Job.created_at, Job.id
+    ).limit(1).with_for_update(skip_locked=True).scalar()
+    if candidate is None:
+        db.session.rollback()
+        return None
+
+    # Compare-and-set so two workers never run the same job, even without SKIP LOCKED
+    claimed = db.session.query(Job).filter(Job.id == candidate, Job.status == 'queued').update({
+        'status': 'running', 'started_at': datetime.utcnow(), 'worker': worker_name
+    }, synchronize_session=False)
+    db.session.commit()
+    return db.session.get(Job, candidate) if claimed else None
+
+
+def run_job(job):
+    """Run a claimed job and record its outcome"""
+    try:
+        outcome, error = JOB_TYPES[job.job_type](job.params or {}, job), None
+    except Exception as e:
+        outcome, error = None, e
+        logger.exception("Job %s (%s) failed", job.id, job.job_type)
+    finally:
+        # Job bookkeeping always reads and writes the primary
+        g.pop('read_engine', None)
+
+    if error is None:
+        job.result = outcome.get('result')
+        job.result_path = outcome.get('file')
+        job.result_filename = outcome.get('filename')
+        job.result_mimetype = outcome.get('mimetype')
+        job.status = 'succeeded'
+    else:
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = str(error)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def requeue_interrupted():
+    """Put jobs left running by a stopped runner back in the queue; returns how many"""
+    count = db.session.query(Job).filter(Job.status == 'running').update({
+        'status': 'queued', 'started_at': None, 'worker': None
+    }, synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def work(app, poll_seconds):
+    """Worker process loop: claim and run jobs until SIGTERM/SIGINT"""
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *args: stopping.append(True))
+    worker_name = f'{socket.gethostname()}:{os.getpid()}'
+
+    with app.app_context():
+        # Connections inherited from the parent process must not be shared
+        db.engine.dispose(close=False)
+
+        while not stopping:
+            job = claim_next(worker_name)
+            if job is None:
+                time.sleep(poll_seconds)
+                continue
+            logger.info("%s running job %s (%s)", worker_name, job.id, job.job_type)
+            run_job(job)
+            logger.info("Job %s %s", job.id, job.status)
@@ -0,0 +1,49 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, encoding several times faster,
+    straight to bytes. Values decode the same as with the default provider
+    (sorted keys, dates as HTTP dates, Decimal and UUID as strings), but
+    non-ASCII text is written as UTF-8 rather than \\uXXXX escapes. What orjson
+    cannot encode (integers beyond 64 bits) goes through the default provider.
+    """
+
+    def _options(self, kwargs):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return self._dump_bytes(obj, **kwargs).decode()
+
+    def _dump_bytes(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=self._options(kwargs))
+        except TypeError:  # orjson.JSONEncodeError
+            return super().dumps(obj, **kwargs).encode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Pretty-printed in debug mode, like the default provider
+        indent = 2 if self.compact is False or (self.compact is None and self._app.debug) else None
+        return self._app.response_class(self._dump_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Use orjson for jsonify/request.get_json when JSON_PROVIDER is 'orjson' and it is installed"""
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
+    return app.json
@@ -0,0 +1,139 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import current_app, g, has_request_context, request
+
+access_logger = logging.getLogger('access')
+
+# LogRecord attributes that are not `extra=` fields
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'request_id'}
+
+_state = {'handler': None, 'listener': None, 'targets': ()}
+
+
+class RequestIdFilter(logging.Filter):
+    """Tag records with the current request id while still on the request thread"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id') if has_request_context() else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request_id, extra fields, exception"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records with only the message interpolated (and any traceback
+    rendered, as it cannot cross threads); formatting and the write itself
+    happen on the listener thread.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _start_listener():
+    log_queue = queue.SimpleQueue()
+    _state['handler'].queue = log_queue
+    _state['listener'] = QueueListener(log_queue, *_state['targets'], respect_handler_level=True)
+    _state['listener'].start()
+
+
+def _stop_listener():
+    if _state['listener'] is not None:
+        _state['listener'].stop()
+        _state['listener'] = None
+
+
+def init_logging(app):
+    """
+    Route all logging through a queue to a stdout handler running on its own
+    thread, at LOG_LEVEL, as JSON (LOG_FORMAT=json) or plain text; and give
+    every request an id (incoming X-Request-ID or a new one) that is echoed
+    back and attached to its log records.
+    """
+    level = logging.getLevelName(str(app.config.get('LOG_LEVEL', 'INFO')).upper())
+    root = logging.getLogger()
+    root.setLevel(level)
+
+    if _state['handler'] is None:
+        target = logging.StreamHandler(sys.stdout)
+        if app.config.get('LOG_FORMAT', 'json') == 'json':
+            target.setFormatter(JsonFormatter())
+        else:
+            target.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'))
+
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        handler.addFilter(RequestIdFilter())
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        _state.update(handler=handler, targets=(target,))
+
+        _start_listener()
+        # The listener thread does not survive fork (gunicorn --preload, the job pool)
+        os.register_at_fork(after_in_child=_start_listener)
+        atexit.register(_stop_listener)
+
+    # Flask's own logger would otherwise also write straight to stderr
+    app.logger.handlers.clear()
+    app.logger.propagate = True
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def _start_request():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    g.request_started = time.perf_counter()
+
+
+def _finish_request(response):
+    if 'request_started' not in g:
+        return response
+    response.headers['X-Request-ID'] = g.request_id
+    if not current_app.config.get('LOG_REQUESTS', True):
+        return response
+    access_logger.info('%s %s %s', request.method, request.path, response.status_code, extra={
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - g.request_started) * 1000, 2),
+        'remote_addr': request.remote_addr
+    })
+    return response
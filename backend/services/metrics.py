@@ -0,0 +1,94 @@
+import hmac
+import os
+import time
+from flask import Response, current_app, g, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from models import db
+
+# Metrics live in PROMETHEUS_MULTIPROC_DIR when it is set (before this module is
+# imported), so the /metrics response of any worker covers all of them
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by blueprint and endpoint',
+    ['blueprint', 'endpoint', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by endpoint and status code',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+DB_QUERIES = Counter('db_queries_total', 'SQL statements executed while serving requests', ['endpoint'])
+DB_QUERY_SECONDS = Counter('db_query_seconds_total', 'Time spent in SQL statements while serving requests', ['endpoint'])
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Primary pool connections in use, per worker', multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Primary pool connections open beyond pool_size, per worker', multiprocess_mode='livesum'
+)
+CACHE_REQUESTS = Counter('analytics_cache_requests_total', 'Analytics cache lookups', ['result'])
+SALES = Counter('sales_total', 'Sales recorded', ['sale_type'])
+SALES_REVENUE = Counter('sales_revenue_total', 'Revenue of recorded sales', ['sale_type'])
+LOGINS_THROTTLED = Counter('login_throttled_total', 'Login attempts rejected by the throttle', ['scope'])
+
+
+def _scrape_allowed():
+    """Bearer METRICS_TOKEN when one is configured, otherwise a METRICS_ALLOWED_IPS client address"""
+    config = current_app.config
+    token = config.get('METRICS_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    allowed = {address.strip() for address in (config.get('METRICS_ALLOWED_IPS') or '').split(',')}
+    return request.remote_addr in allowed
+
+
+def init_metrics(app):
+    """Record request metrics and serve them at METRICS_PATH (default /metrics)"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+
+        # Unmatched URLs share one label value so 404 scans cannot add series
+        endpoint = request.endpoint or 'unmatched'
+        blueprint = request.blueprint or ''
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, endpoint, request.method, response.status_code).inc()
+
+        stats = g.get('query_stats')
+        if stats is not None and stats.count:
+            DB_QUERIES.labels(endpoint).inc(stats.count)
+            DB_QUERY_SECONDS.labels(endpoint).inc(stats.duration)
+
+        pool = db.engine.pool
+        if hasattr(pool, 'checkedout'):
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        return response
+
+    @app.route(app.config.get('METRICS_PATH', '/metrics'))
+    def metrics():
+        # Revenue and traffic figures: not for the public bind
+        if not _scrape_allowed():
+            return jsonify({'message': 'Forbidden'}), 403
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live gauges (gunicorn child_exit hook)"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,129 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Collapse expanded IN lists and literal numbers so repeats of one query shape match
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACE = re.compile(r'\s+')
+
+
+class QueryStats:
+    """Statements executed in one request (or any block that installs it), with total DB time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement, duration):
+        shape = _SPACE.sub(' ', _NUMBER.sub('N', _IN_LIST.sub('(...)', statement))).strip()
+        # Dashboard widgets add to the request's stats from their own threads
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold):
+        """(shape, count) for statements executed more than `threshold` times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def current_query_stats():
+    """The QueryStats collecting for the current app context, if any"""
+    return g.get('query_stats') if has_app_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats()
+    started = conn.info.get('query_started')
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+def init_query_stats(app):
+    """
+    Count the statements and DB time of every request on every engine (primary
+    and replica). Reported in a Server-Timing header; statement shapes repeated
+    more than QUERY_REPEAT_THRESHOLD times are logged as likely N+1 patterns.
+    """
+    if not app.config.get('QUERY_STATS', True):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+    threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 10)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+        g.query_stats_started = time.perf_counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - g.query_stats_started) * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+        )
+        for shape, count in stats.repeated(threshold):
+            logger.warning('Statement ran %d times in one request (likely N+1): %s', count, shape[:300], extra={
+                'query_count': count, 'statement': shape[:1000]
+            })
+        return response
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries):
+    """
+    Raise QueryBudgetExceeded when the block executes more than `max_queries`
+    statements on any engine, e.g. around a test client call:
+
+        with query_budget(5):
+            client.get('/api/products', headers=headers)
+    """
+    stats = QueryStats()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        stats.record(statement, 0.0)
+
+    event.listen(Engine, 'after_cursor_execute', count)
+    try:
+        yield stats
+    finally:
+        event.remove(Engine, 'after_cursor_execute', count)
+
+    if stats.count > max_queries:
+        shapes = '\n'.join(f'{times}x {shape[:200]}' for shape, times in stats.shapes.most_common(5))
+        raise QueryBudgetExceeded(f'{stats.count} queries, budget {max_queries}:\n{shapes}')
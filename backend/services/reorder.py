@@ -0,0 +1,120 @@
+import numpy as np
+from datetime import timedelta
+from models import db
+from models.product import Product
+from models.rollup import SalesDailyRollup
+from services.analytics import stock_levels
+from services.clock import business_today
+
+MOVING_AVERAGE_DAYS = 28
+SMOOTHING_ALPHA = 0.1
+SAFETY_Z = 1.65  # ~95% service level
+
+
+def demand_matrix(history_days):
+    """
+    Units sold per product per business day over the last `history_days` days
+    (today included) from one rollup query, as (product_ids, products x days array).
+    """
+    today = business_today()
+    range_start = today - timedelta(days=history_days - 1)
+
+    rows = db.session.query(
+        SalesDailyRollup.product_id,
+        SalesDailyRollup.business_date,
+        SalesDailyRollup.units
+    ).filter(
+        SalesDailyRollup.business_date >= range_start,
+        SalesDailyRollup.business_date <= today
+    ).all()
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.zeros((0, history_days), dtype=np.float32)
+
+    product_col, date_col, units_col = zip(*rows)
+    product_ids, product_index = np.unique(np.array(product_col, dtype=np.int64), return_inverse=True)
+    day_index = (np.array(date_col, dtype='datetime64[D]') - np.datetime64(range_start, 'D')).astype(np.int64)
+
+    matrix = np.zeros((len(product_ids), history_days), dtype=np.float32)
+    np.add.at(matrix, (product_index, day_index), np.array(units_col, dtype=np.float32))
+    return product_ids, matrix
+
+
+def current_stock(product_ids):
+    """On-hand units aligned with the sorted `product_ids` array (missing or negative -> 0)"""
+    stock = stock_levels()
+    rows = db.session.query(stock.c.product_id, stock.c.stock).order_by(stock.c.product_id).all()
+    on_hand = np.zeros(len(product_ids), dtype=np.float32)
+    if not rows:
+        return on_hand
+
+    stock_ids, stock_values = (np.array(column) for column in zip(*rows))
+    position = np.minimum(np.searchsorted(stock_ids, product_ids), len(stock_ids) - 1)
+    found = stock_ids[position] == product_ids
+    on_hand[found] = stock_values[position[found]]
+    return np.maximum(on_hand, 0)
+
+
+def forecast(matrix, window=MOVING_AVERAGE_DAYS, alpha=SMOOTHING_ALPHA):
+    """Moving-average and exponentially smoothed daily demand plus daily std-dev, per row"""
+    days = matrix.shape[1]
+    moving_average = matrix[:, -min(window, days):].mean(axis=1)
+
+    # Simple exponential smoothing seeded with the first day, as one matrix-vector
+    # product: s_n = (1 - a)^(n-1) * x_0 + sum_t a * (1 - a)^(n-1-t) * x_t
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (days - 1)
+    smoothed = matrix @ weights.astype(np.float32)
+
+    return moving_average, smoothed, matrix.std(axis=1)
+
+
+def reorder_suggestions(history_days=90, lead_time_days=7, cover_days=14, limit=100):
+    """
+    Products whose projected demand over lead time plus `cover_days` exceeds
+    current stock, with the quantity to order, most urgent (least cover) first.
+    """
+    product_ids, matrix = demand_matrix(history_days)
+    if not len(product_ids):
+        return []
+
+    on_hand = current_stock(product_ids)
+
+    moving_average, smoothed, deviation = forecast(matrix)
+    demand = np.maximum(moving_average, smoothed)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(demand > 0, on_hand / demand, np.inf)
+
+    safety_stock = SAFETY_Z * deviation * np.sqrt(lead_time_days)
+    target = demand * (lead_time_days + cover_days) + safety_stock
+    suggested = np.ceil(np.maximum(target - on_hand, 0)).astype(np.int64)
+
+    selected = np.flatnonzero(suggested > 0)
+    selected = selected[np.argsort(days_of_cover[selected], kind='stable')][:limit]
+    if not len(selected):
+        return []
+
+    products = {
+        product.id: product for product in db.session.query(
+            Product.id, Product.name, Product.brand, Product.sku
+        ).filter(Product.id.in_(product_ids[selected].tolist())).all()
+    }
+
+    suggestions = []
+    for i in selected.tolist():
+        product = products.get(int(product_ids[i]))
+        if product is None:
+            continue
+        suggestions.append({
+            'product_id': product.id,
+            'name': product.name,
+            'brand': product.brand,
+            'sku': product.sku,
+            'stock': int(on_hand[i]),
+            'moving_average': round(float(moving_average[i]), 2),
+            'smoothed_demand': round(float(smoothed[i]), 2),
+            'days_of_cover': round(float(days_of_cover[i]), 1) if np.isfinite(days_of_cover[i]) else None,
+            'suggested_quantity': int(suggested[i])
+        })
+    return suggestions
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g
+from models import db
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+
+# Replication lag on a Postgres standby; 0 when the server is not in recovery or has
+# replayed all the WAL it received (an idle primary would otherwise look like growing lag)
+POSTGRES_LAG_QUERY = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_health = {'checked_at': None, 'healthy': False, 'lag': None}
+_health_lock = threading.Lock()
+
+
+def _measure_lag(engine):
+    query = current_app.config['REPLICA_LAG_QUERY']
+    if query is None and engine.dialect.name == 'postgresql':
+        query = POSTGRES_LAG_QUERY
+    with engine.connect() as connection:
+        if query is None:
+            connection.execute(db.text('SELECT 1'))
+            return 0.0
+        return float(connection.execute(db.text(query)).scalar() or 0)
+
+
+def replica_healthy(engine, fresh=False):
+    """
+    Whether the replica answers and lags less than REPLICA_MAX_LAG_SECONDS
+    (checked at most every REPLICA_LAG_CHECK_SECONDS unless `fresh`)
+    """
+    config = current_app.config
+    with _health_lock:
+        now = time.monotonic()
+        checked_at = _health['checked_at']
+        if not fresh and checked_at is not None and now - checked_at < config['REPLICA_LAG_CHECK_SECONDS']:
+            return _health['healthy']
+
+        lag = None
+        try:
+            lag = _measure_lag(engine)
+            healthy = lag <= config['REPLICA_MAX_LAG_SECONDS']
+            if not healthy:
+                logger.warning("Replica lags %.1fs, reading from the primary", lag)
+        except Exception as e:
+            logger.warning("Replica unavailable, reading from the primary: %s", e)
+            healthy = False
+
+        _health.update(checked_at=now, healthy=healthy, lag=lag)
+        return healthy
+
+
+def use_replica():
+    """
+    Route this app context's reads to the replica bind when it is configured and
+    healthy. A response that is about to be cached (g.filling_cache) is only read
+    from a replica that has caught up, so data from before the latest write is
+    never stored under the new data version.
+    """
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        usable = False
+    elif g.get('filling_cache'):
+        usable = replica_healthy(engine, fresh=True) and _health['lag'] <= 0
+    else:
+        usable = replica_healthy(engine)
+    g.read_engine = engine if usable else None
+    return usable
+
+
+def using_replica():
+    return g.get('read_engine') is not None
+
+
+def read_replica(view):
+    """
+    Decorator for read-only views: their queries go to the replica, writes stay
+    on the primary, and statements get the longer report timeout.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_role = 'reports'
+        use_replica()
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,27 @@
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+
+ROLE_PERMISSIONS = {
+    'admin': ['catalog:write', 'catalog:delete', 'analytics:refresh', 'auth:stats', 'users:manage'],
+    'staff': []
+}
+
+
+def role_claims(role):
+    """Claims embedded in every token issued for a user with `role`"""
+    role = role or 'staff'
+    return {'role': role, 'permissions': ROLE_PERMISSIONS.get(role, [])}
+
+
+def require_permission(permission):
+    """Verify the access token, then 403 unless its `permissions` claim includes `permission`"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if permission not in get_jwt().get('permissions', ()):
+                return jsonify({'message': 'Insufficient permissions'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,99 @@
+from models import db
+from models.rollup import SalesDailyRollup, SalesHourlyRollup
+from models.sale import Sale, SaleItem
+from services.clock import business_datetime_for, business_timestamp
+
+
+def _upsert(model, rows, totals):
+    """Add the `totals` columns of `rows` onto existing `model` rows, inserting the ones that are missing"""
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        table = model.__table__
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={name: table.c[name] + stmt.excluded[name] for name in totals}
+        )
+        db.session.execute(stmt)
+        return
+
+    primary_key = [column.name for column in model.__table__.primary_key.columns]
+    for row in rows:
+        existing = db.session.get(
+            model, tuple(row[name] for name in primary_key), with_for_update=True
+        )
+        if existing is None:
+            db.session.add(model(**row))
+        else:
+            for name in totals:
+                setattr(existing, name, getattr(existing, name) + row[name])
+
+
+def _new_entry(brand, category):
+    return {'brand': brand, 'category': category, 'units': 0, 'revenue': 0.0, 'cost': 0.0}
+
+
+def record_sale(sale, items):
+    """Fold a sale and its SaleItems into the daily and hourly rollups inside the caller's transaction"""
+    business_date = sale.business_date
+
+    totals = {}
+    for item in items:
+        entry = totals.setdefault(item.product_id, _new_entry(item.product_brand, item.product_category))
+        entry['units'] += item.quantity
+        entry['revenue'] += item.quantity * item.unit_price
+        entry['cost'] += item.quantity * item.unit_cost
+
+    rows = [
+        {'business_date': business_date, 'product_id': product_id, **entry}
+        for product_id, entry in totals.items()
+    ]
+    if rows:
+        _upsert(SalesDailyRollup, rows, ('units', 'revenue', 'cost'))
+
+    _upsert(SalesHourlyRollup, [{
+        'business_date': business_date,
+        'hour': business_datetime_for(sale.created_at).hour,
+        'transactions': 1,
+        'revenue': sale.total_amount
+    }], ('transactions', 'revenue'))
+
+
+def rebuild_rollup():
+    """Recompute the daily and hourly rollups from sale history; returns the number of daily rows written"""
+    table = SalesDailyRollup.__table__
+    select = db.select(
+        Sale.business_date,
+        SaleItem.product_id,
+        db.func.max(SaleItem.product_brand),
+        db.func.max(SaleItem.product_category),
+        db.func.sum(SaleItem.quantity),
+        db.func.sum(SaleItem.quantity * SaleItem.unit_price),
+        db.func.sum(SaleItem.quantity * db.func.coalesce(SaleItem.unit_cost, 0))
+    ).join(Sale, SaleItem.sale_id == Sale.id).group_by(Sale.business_date, SaleItem.product_id)
+
+    hour = db.extract('hour', business_timestamp(Sale.created_at))
+    hourly_select = db.select(
+        Sale.business_date,
+        hour,
+        db.func.count(Sale.id),
+        db.func.sum(Sale.total_amount)
+    ).group_by(Sale.business_date, hour)
+
+    db.session.query(SalesDailyRollup).delete()
+    db.session.query(SalesHourlyRollup).delete()
+    result = db.session.execute(table.insert().from_select(
+        ['business_date', 'product_id', 'brand', 'category', 'units', 'revenue', 'cost'], select
+    ))
+    db.session.execute(SalesHourlyRollup.__table__.insert().from_select(
+        ['business_date', 'hour', 'transactions', 'revenue'], hourly_select
+    ))
+    db.session.commit()
+
+    return result.rowcount
@@ -0,0 +1,178 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from flask import current_app
+from services.metrics import LOGINS_THROTTLED
+
+THROTTLED_COUNTER = 'login-throttled:{scope}'
+
+
+def _refill(tokens, updated, now, capacity, per_second):
+    if tokens is None:
+        return float(capacity)
+    return min(float(capacity), tokens + (now - updated) * per_second)
+
+
+class MemoryBucketStore:
+    """Per-process token buckets; only for a single worker or development"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, per_second, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (None, now))
+            tokens = _refill(tokens, updated, now, capacity, per_second)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            return allowed, tokens
+
+    def incr(self, name):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def counters(self):
+        return dict(self._counters)
+
+
+class SQLiteBucketStore:
+    """Token buckets in a local SQLite file shared by every worker on the box"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+            connection.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)')
+
+    def _connect(self):
+        # One connection per thread and per process (never reused across fork)
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return self._local.connection
+
+    def take(self, key, capacity, per_second, now):
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = _refill(row[0] if row else None, row[1] if row else now, now, capacity, per_second)
+            allowed = tokens >= 1
+            connection.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens - 1 if allowed else tokens, now)
+            )
+            # Forget buckets idle long enough to have refilled completely
+            connection.execute('DELETE FROM buckets WHERE updated < ?', (now - 3600,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+    def incr(self, name):
+        self._connect().execute(
+            'INSERT INTO counters (name, value) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + 1', (name,)
+        )
+
+    def counters(self):
+        return dict(self._connect().execute('SELECT name, value FROM counters').fetchall())
+
+
+class RedisBucketStore:
+    """Token buckets on a Redis-compatible server (requires the `redis` package)"""
+
+    TAKE_SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local capacity, per_second, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local tokens = capacity
+    if bucket[1] then
+        tokens = math.min(capacity, tonumber(bucket[1]) + (now - tonumber(bucket[2])) * per_second)
+    end
+    local allowed = 0
+    local remaining = tokens
+    if tokens >= 1 then
+        allowed = 1
+        remaining = tokens - 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', remaining, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], 3600)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(self.TAKE_SCRIPT)
+
+    def take(self, key, capacity, per_second, now):
+        allowed, tokens = self._take(keys=[f'throttle:{key}'], args=[capacity, per_second, now])
+        return bool(allowed), float(tokens)
+
+    def incr(self, name):
+        self._client.incr(f'throttle-counter:{name}')
+
+    def counters(self):
+        keys = self._client.keys('throttle-counter:*')
+        return {
+            key.decode().split(':', 1)[1]: int(value)
+            for key, value in zip(keys, self._client.mget(keys) if keys else [])
+        }
+
+
+def init_throttle(app):
+    """Create the login throttle store configured by LOGIN_THROTTLE_BACKEND"""
+    backend = app.config.get('LOGIN_THROTTLE_BACKEND', 'sqlite')
+
+    if backend == 'sqlite':
+        store = SQLiteBucketStore(app.config['LOGIN_THROTTLE_DB'])
+    elif backend == 'memory':
+        store = MemoryBucketStore()
+    elif backend == 'redis':
+        store = RedisBucketStore(app.config['LOGIN_THROTTLE_REDIS_URL'])
+    elif backend in ('none', '', None):
+        store = None
+    else:
+        raise ValueError(f"Unknown LOGIN_THROTTLE_BACKEND: {backend}")
+
+    app.extensions['login_throttle'] = store
+    return store
+
+
+def check_login(username, remote_addr):
+    """
+    Take one token from the caller's IP bucket and the username's bucket.
+    Returns None when the attempt may proceed, else the seconds to wait.
+    """
+    store = current_app.extensions.get('login_throttle')
+    if store is None:
+        return None
+
+    config = current_app.config
+    now = time.time()
+    buckets = (
+        ('ip', remote_addr or 'unknown', config['LOGIN_THROTTLE_IP_BURST'], config['LOGIN_THROTTLE_IP_PER_MINUTE']),
+        ('username', str(username).strip().lower(), config['LOGIN_THROTTLE_USER_BURST'], config['LOGIN_THROTTLE_USER_PER_MINUTE'])
+    )
+    for scope, value, capacity, per_minute in buckets:
+        per_second = per_minute / 60.0
+        allowed, tokens = store.take(f'login:{scope}:{value}', capacity, per_second, now)
+        if not allowed:
+            store.incr(THROTTLED_COUNTER.format(scope=scope))
+            LOGINS_THROTTLED.labels(scope).inc()
+            return max(1, math.ceil((1 - tokens) / per_second))
+    return None
+
+
+def throttle_counters():
+    """Throttled login attempts per scope, shared across workers"""
+    store = current_app.extensions.get('login_throttle')
+    return store.counters() if store is not None else {}
@@ -0,0 +1,67 @@
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from models import db
+from models.token import RevokedToken
+
+# Per-worker snapshot of revoked access-token jtis, reloaded every
+# TOKEN_REVOCATION_CACHE_SECONDS (it only holds unexpired revocations)
+_revoked_access = {'jtis': frozenset(), 'loaded_at': None}
+_cache_lock = threading.Lock()
+
+
+def _revoked_access_jtis():
+    with _cache_lock:
+        loaded_at = _revoked_access['loaded_at']
+        if loaded_at is None or time.monotonic() - loaded_at >= current_app.config['TOKEN_REVOCATION_CACHE_SECONDS']:
+            rows = db.session.query(RevokedToken.jti).filter(
+                RevokedToken.token_type == 'access',
+                RevokedToken.expires_at > datetime.utcnow()
+            ).all()
+            _revoked_access.update(jtis=frozenset(jti for jti, in rows), loaded_at=time.monotonic())
+        return _revoked_access['jtis']
+
+
+def is_revoked(jwt_payload):
+    """
+    Blocklist check for flask_jwt_extended. Refresh tokens (used rarely) are
+    looked up in the table by its indexed jti; access tokens against the cached
+    snapshot, so ordinary requests cost no DB round-trip.
+    """
+    jti = jwt_payload['jti']
+    if jwt_payload.get('type') != 'refresh':
+        return jti in _revoked_access_jtis()
+    return db.session.query(RevokedToken.id).filter(RevokedToken.jti == jti).first() is not None
+
+
+def revoke(jwt_payload):
+    """
+    Record a token as revoked; returns False if it already was, which makes
+    refresh-token rotation single-use even when two requests race.
+    """
+    token = RevokedToken(
+        jti=jwt_payload['jti'],
+        token_type=jwt_payload.get('type', 'access'),
+        user_id=jwt_payload.get('sub'),
+        expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+    )
+    db.session.add(token)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+    if token.token_type != 'refresh':
+        with _cache_lock:
+            _revoked_access['jtis'] = _revoked_access['jtis'] | {token.jti}
+    return True
+
+
+def prune_expired():
+    """Delete revocations of tokens that have expired anyway; returns the row count"""
+    count = db.session.query(RevokedToken).filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    return count
@@ -1,15 +1,71 @@
 #!/bin/bash
 
-# Kill any existing process on port 5000
-echo "Stopping any existing processes on port 5000..."
-sudo kill -9 $(sudo lsof -t -i:5000) 2>/dev/null || true
-
 # Activate virtual environment
 source venv/bin/activate
 
 # Set production environment
 export FLASK_ENV=production
 
-# Start gunicorn
+# Start gunicorn (worker class, counts and timeouts: gunicorn.conf.py)
+# gevent workers hold idle /api/events (SSE) streams as cheap greenlets;
+# events reach every worker through Postgres LISTEN/NOTIFY
+export GUNICORN_WORKER_CLASS=${GUNICORN_WORKER_CLASS:-gevent}
+export GUNICORN_PIDFILE=${GUNICORN_PIDFILE:-/tmp/smartshoe-gunicorn.pid}
+export EVENTS_BACKEND=${EVENTS_BACKEND:-postgres}
+# Analytics responses are cached once for all workers, so a sale invalidates every worker's view
+export ANALYTICS_CACHE_BACKEND=${ANALYTICS_CACHE_BACKEND:-filesystem}
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/smartshoe-metrics}
+
+# Worker count also sizes each worker's database pool (see DB_MAX_CONNECTIONS)
+export WEB_CONCURRENCY=${WEB_CONCURRENCY:-4}
+
+# Job workers log to one file whichever path starts them; they outlive this script
+export JOBS_LOG=${JOBS_LOG:-/tmp/smartshoe-jobs.log}
+
+# Heavy reports (POST /api/jobs) run in a separate process pool, not in gunicorn workers.
+# Running workers finish their current job on SIGTERM before the new code takes over.
+start_job_workers() {
+    pkill -f "flask --app wsgi run-jobs" 2>/dev/null || true
+    echo "Starting background job workers (log: $JOBS_LOG)..."
+    nohup flask --app wsgi run-jobs >>"$JOBS_LOG" 2>&1 &
+}
+
+if [ -f "$GUNICORN_PIDFILE" ] && kill -0 "$(cat "$GUNICORN_PIDFILE")" 2>/dev/null; then
+    # Already running: start a new master on the new code (USR2), then let the
+    # old one finish its requests and exit, so the port never stops accepting.
+    # The new master inherits the running master's environment and writes its
+    # pid to $GUNICORN_PIDFILE.2 once it listens, taking over the pidfile when
+    # the old master exits.
+    OLD_PID=$(cat "$GUNICORN_PIDFILE")
+    rm -f "$GUNICORN_PIDFILE.2"
+    echo "Upgrading Gunicorn (master $OLD_PID)..."
+    kill -USR2 "$OLD_PID"
+    NEW_PID=
+    for _ in $(seq 60); do
+        NEW_PID=$(cat "$GUNICORN_PIDFILE.2" 2>/dev/null)
+        [ -n "$NEW_PID" ] && kill -0 "$NEW_PID" 2>/dev/null && break
+        NEW_PID=
+        sleep 1
+    done
+    if [ -z "$NEW_PID" ]; then
+        echo "New Gunicorn master did not start; the old one and its job workers keep running" >&2
+        exit 1
+    fi
+    kill -TERM "$OLD_PID"
+    echo "Gunicorn master $NEW_PID serving"
+
+    start_job_workers
+    exit 0
+fi
+
+# Cold start: clear anything else holding the port
+echo "Stopping any existing processes on port 5000..."
+sudo kill -9 $(sudo lsof -t -i:5000) 2>/dev/null || true
+
+# Workers share Prometheus metrics through this directory; start it empty
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+start_job_workers
+
 echo "Starting Gunicorn server..."
-gunicorn -w 4 -b 0.0.0.0:5000 --access-logfile - --error-logfile - wsgi:app
\ No newline at end of file
+gunicorn -c gunicorn.conf.py wsgi:app
@@ -9,8 +9,7 @@ def test_register():
     data = {
         "username": "admin",
         "password": "admin123",
-        "email": "admin@shoe.com",
-        "role": "admin"
+        "email": "admin@shoe.com"
     }
     
     try:
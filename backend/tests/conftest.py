@@ -0,0 +1,50 @@
+import os
+import sys
+import pytest
+from flask_jwt_extended import create_access_token
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from app import create_app  # noqa: E402
+from models import db  # noqa: E402
+from models.user import User  # noqa: E402
+from services.querystats import query_budget as _query_budget  # noqa: E402
+from services.roles import role_claims  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """App on a fresh in-memory sqlite database (TEST_DATABASE_URL to override)"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Authorization header for a freshly created admin user"""
+    user = User(username='admin', email='admin@example.com', role='admin')
+    user.set_password('admin123')
+    db.session.add(user)
+    db.session.commit()
+    token = create_access_token(identity=user.id, additional_claims=role_claims(user.role))
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Declare the most SQL statements a block may run; the test fails with the
+    most repeated query shapes when it runs more:
+
+        with query_budget(3):
+            client.get('/api/products', headers=auth_headers)
+    """
+    return _query_budget
@@ -0,0 +1,100 @@
+from flask_jwt_extended import create_refresh_token, decode_token
+from models import db
+from models.user import User
+from routes import auth as auth_routes
+from services.roles import role_claims
+from services.tokens import revoke
+
+NEW_PRODUCT = {
+    'name': 'Oxford', 'brand': 'Bata', 'category': 'Formal', 'size': '42', 'color': 'Black',
+    'purchase_price': 1000, 'retail_price': 1600, 'wholesale_price': 1300
+}
+
+
+def register(client, username='clerk'):
+    response = client.post('/api/auth/register', json={'username': username, 'password': 'secret123'})
+    assert response.status_code == 201
+    return response.json
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_refresh_takes_role_from_the_user_not_the_token(client):
+    user_id = register(client)['user']['id']
+    # A refresh token still carrying admin claims, e.g. issued before a demotion
+    stale = create_refresh_token(identity=user_id, additional_claims=role_claims('admin'))
+
+    response = client.post('/api/auth/refresh', headers=bearer(stale))
+
+    assert response.status_code == 200
+    assert decode_token(response.json['access_token'])['role'] == 'staff'
+    assert decode_token(response.json['refresh_token'])['permissions'] == []
+
+
+def test_role_change_revokes_refresh_tokens(client, auth_headers):
+    registered = register(client)
+    user_id = registered['user']['id']
+
+    response = client.put(f'/api/auth/users/{user_id}/role', json={'role': 'admin'}, headers=auth_headers)
+    assert response.status_code == 200
+    assert db.session.get(User, user_id).role == 'admin'
+
+    response = client.post('/api/auth/refresh', headers=bearer(registered['refresh_token']))
+    assert response.status_code == 401
+
+
+def test_staff_cannot_write_products(client):
+    staff = bearer(register(client)['access_token'])
+
+    assert client.post('/api/products', json=NEW_PRODUCT, headers=staff).status_code == 403
+    assert client.put('/api/products/1', json={'retail_price': 1}, headers=staff).status_code == 403
+
+
+def test_admin_can_write_products(client, auth_headers):
+    response = client.post('/api/products', json=NEW_PRODUCT, headers=auth_headers)
+    assert response.status_code == 201
+
+    product_id = response.json['product']['id']
+    response = client.put(f'/api/products/{product_id}', json={'retail_price': 1700}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['product']['retail_price'] == 1700
+
+
+def test_rotated_refresh_token_is_rejected(client):
+    refresh_token = register(client)['refresh_token']
+
+    first = client.post('/api/auth/refresh', headers=bearer(refresh_token))
+    assert first.status_code == 200
+
+    assert client.post('/api/auth/refresh', headers=bearer(refresh_token)).status_code == 401
+    assert client.post('/api/auth/refresh', headers=bearer(first.json['refresh_token'])).status_code == 200
+
+
+def test_racing_refreshes_rotate_once(client, monkeypatch):
+    refresh_token = register(client)['refresh_token']
+
+    # Another worker rotates the same token after this request passed the
+    # blocklist check; the unique jti makes this request's revoke fail
+    def raced(payload):
+        revoke(payload)
+        return revoke(payload)
+    monkeypatch.setattr(auth_routes, 'revoke', raced)
+
+    response = client.post('/api/auth/refresh', headers=bearer(refresh_token))
+
+    assert response.status_code == 401
+    assert 'access_token' not in response.json
+
+
+def test_logout_revokes_access_and_refresh_tokens(client):
+    tokens = register(client)
+
+    response = client.post(
+        '/api/auth/logout', json={'refresh_token': tokens['refresh_token']}, headers=bearer(tokens['access_token'])
+    )
+
+    assert response.status_code == 200
+    assert client.get('/api/products', headers=bearer(tokens['access_token'])).status_code == 401
+    assert client.post('/api/auth/refresh', headers=bearer(tokens['refresh_token'])).status_code == 401
@@ -0,0 +1,14 @@
+from models import db
+
+
+def test_classification_table_exists_without_loading_the_service(app):
+    assert 'product_classifications' in db.inspect(db.engine).get_table_names()
+
+
+def test_refresh_then_read_classification(client, auth_headers):
+    refreshed = client.post('/api/sales/analytics/classification/refresh', headers=auth_headers)
+    assert refreshed.status_code == 200
+
+    response = client.get('/api/sales/analytics/classification', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json['success'] is True
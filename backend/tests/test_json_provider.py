@@ -0,0 +1,27 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from services.json_provider import OrjsonProvider, orjson
+
+pytestmark = pytest.mark.skipif(orjson is None, reason='orjson not installed')
+
+
+@pytest.mark.parametrize('value', [
+    {'b': 1, 'a': [1.5, None, True]},
+    {'when': datetime(2024, 5, 1, 12, 30), 'price': Decimal('10.50')},
+    {'name': 'Café Ñandú 👟'},
+    {'id': 2 ** 70, 'nested': {'big': -(2 ** 64)}}
+])
+def test_orjson_provider_decodes_like_the_default_provider(app, value):
+    expected = json.loads(DefaultJSONProvider(app).dumps(value))
+    assert json.loads(OrjsonProvider(app).dumps(value)) == expected
+
+
+def test_response_falls_back_for_integers_beyond_64_bits(app):
+    app.json = OrjsonProvider(app)
+    with app.test_request_context('/'):
+        response = app.json.response({'id': 2 ** 70})
+    assert response.status_code == 200
+    assert json.loads(response.get_data()) == {'id': 2 ** 70}
@@ -0,0 +1,43 @@
+import pytest
+from models import db
+from models.inventory import InventoryItem
+from models.product import Product
+from services.querystats import QueryBudgetExceeded
+
+
+def add_products(count):
+    products = [
+        Product(
+            name=f'Shoe {i}', brand='Bata', category='Formal', size='42', color='Black',
+            purchase_price=1000, retail_price=1600, wholesale_price=1300, sku=f'TEST-{i:04d}'
+        )
+        for i in range(count)
+    ]
+    db.session.add_all(products)
+    db.session.flush()
+    for product in products:
+        db.session.add(InventoryItem(product_id=product.id, transaction_type='in', quantity=10))
+        db.session.add(InventoryItem(product_id=product.id, transaction_type='out', quantity=3))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.mark.parametrize('count', [1, 25])
+def test_product_list_query_count_does_not_grow_with_products(client, auth_headers, query_budget, count):
+    add_products(count)
+
+    # Token revocation check plus the product/stock query
+    with query_budget(3):
+        response = client.get('/api/products', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json['count'] == count
+    assert {product['current_stock'] for product in response.json['products']} == {7}
+
+
+def test_query_budget_fails_when_exceeded(client, auth_headers, query_budget):
+    add_products(3)
+
+    with pytest.raises(QueryBudgetExceeded, match='budget 0'):
+        with query_budget(0):
+            client.get('/api/products', headers=auth_headers)
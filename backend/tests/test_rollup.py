@@ -0,0 +1,87 @@
+from datetime import datetime
+import pytest
+import pytz
+from models import db
+from models.inventory import InventoryItem
+from models.product import Product
+from models.rollup import SalesDailyRollup, SalesHourlyRollup
+from services import clock
+from services.rollup import rebuild_rollup
+
+
+class FrozenClock(datetime):
+    """Stands in for services.clock.datetime so sales are stamped at `utc`"""
+    utc = None
+
+    @classmethod
+    def utcnow(cls):
+        return cls.utc
+
+    @classmethod
+    def now(cls, tz=None):
+        return pytz.utc.localize(cls.utc).astimezone(tz) if tz else cls.utc
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    monkeypatch.setattr(FrozenClock, 'utc', datetime.utcnow())
+    monkeypatch.setattr(clock, 'datetime', FrozenClock)
+    return FrozenClock
+
+
+def add_products(*names):
+    products = [
+        Product(
+            name=name, brand=brand, category='Running', size='42', color='Black',
+            purchase_price=1000, retail_price=1600, wholesale_price=1300, sku=f'TEST-{name}'
+        )
+        for name, brand in zip(names, ('Nike', 'Adidas'))
+    ]
+    db.session.add_all(products)
+    db.session.flush()
+    db.session.add_all(InventoryItem(product_id=p.id, transaction_type='in', quantity=100) for p in products)
+    db.session.commit()
+    return [product.id for product in products]
+
+
+def snapshot():
+    daily = db.session.query(
+        SalesDailyRollup.business_date, SalesDailyRollup.product_id, SalesDailyRollup.brand,
+        SalesDailyRollup.category, SalesDailyRollup.units, SalesDailyRollup.revenue, SalesDailyRollup.cost
+    ).order_by(SalesDailyRollup.business_date, SalesDailyRollup.product_id).all()
+    hourly = db.session.query(
+        SalesHourlyRollup.business_date, SalesHourlyRollup.hour,
+        SalesHourlyRollup.transactions, SalesHourlyRollup.revenue
+    ).order_by(SalesHourlyRollup.business_date, SalesHourlyRollup.hour).all()
+    return [tuple(row) for row in daily], [tuple(row) for row in hourly]
+
+
+def test_incremental_rollup_matches_rebuild(client, auth_headers, frozen_clock):
+    shoe, boot = add_products('Shoe', 'Boot')
+    # Nairobi is UTC+3: the business day turns over at 21:00 UTC
+    sales = [
+        (datetime(2026, 3, 9, 8, 15), [(shoe, 2, 1600)]),
+        (datetime(2026, 3, 9, 8, 40), [(shoe, 1, 1500), (boot, 1, 1600)]),
+        (datetime(2026, 3, 9, 20, 59), [(boot, 3, 1550)]),
+        (datetime(2026, 3, 9, 21, 0), [(boot, 1, 1600)]),
+        (datetime(2026, 3, 10, 1, 30), [(shoe, 4, 1600), (boot, 2, 1580)]),
+    ]
+    for created_at, items in sales:
+        frozen_clock.utc = created_at
+        response = client.post('/api/sales/', headers=auth_headers, json={
+            'sale_type': 'retail',
+            'items': [{'product_id': p, 'quantity': q, 'unit_price': price} for p, q, price in items]
+        })
+        assert response.status_code == 201
+
+    incremental = snapshot()
+    daily, hourly = incremental
+    # 20:59 UTC is 23:59 on the 9th, 21:00 UTC already 00:00 on the 10th
+    assert [(str(day), hour, count) for day, hour, count, _ in hourly] == [
+        ('2026-03-09', 11, 2), ('2026-03-09', 23, 1), ('2026-03-10', 0, 1), ('2026-03-10', 4, 1)
+    ]
+    assert len(daily) == 4
+
+    rebuild_rollup()
+
+    assert snapshot() == incremental
@@ -0,0 +1,61 @@
+import pytest
+from models import db
+from models.inventory import InventoryItem
+from models.product import Product
+from models.sale import Sale, SaleItem
+from services import cache, events
+
+
+def add_product(stock=10):
+    product = Product(
+        name='Oxford', brand='Bata', category='Formal', size='42', color='Black',
+        purchase_price=1000, retail_price=1600, wholesale_price=1300, sku='TEST-OXFORD'
+    )
+    db.session.add(product)
+    db.session.flush()
+    db.session.add(InventoryItem(product_id=product.id, transaction_type='in', quantity=stock))
+    db.session.commit()
+    return product.id
+
+
+def test_sale_accepts_product_id_as_string(client, auth_headers):
+    product_id = add_product()
+
+    response = client.post('/api/sales/', headers=auth_headers, json={
+        'sale_type': 'retail',
+        'items': [{'product_id': str(product_id), 'quantity': 2, 'unit_price': 1600}]
+    })
+
+    assert response.status_code == 201
+    item = SaleItem.query.one()
+    assert (item.product_id, item.unit_cost) == (product_id, 1000)
+    assert db.session.get(Product, product_id).get_current_stock() == 8
+
+
+@pytest.fixture
+def failing_side_channels(monkeypatch):
+    """pg_notify and cache invalidation both failing after the commit"""
+    def fail(*args, **kwargs):
+        raise RuntimeError('notify payload too large')
+    monkeypatch.setattr(events, '_publish_all', fail)
+    monkeypatch.setattr(cache, 'get_cache', lambda: type('Broken', (), {'incr': fail})())
+
+
+def test_sale_succeeds_when_publishing_fails(client, auth_headers, failing_side_channels):
+    product_id = add_product()
+
+    response = client.post('/api/sales/', headers=auth_headers, json={
+        'sale_type': 'retail', 'items': [{'product_id': product_id, 'quantity': 1, 'unit_price': 1600}]
+    })
+
+    assert response.status_code == 201
+    assert Sale.query.count() == 1
+
+
+def test_stock_in_succeeds_when_publishing_fails(client, auth_headers, failing_side_channels):
+    product_id = add_product()
+
+    response = client.post('/api/inventory/stock-in', headers=auth_headers, json={'product_id': product_id, 'quantity': 5})
+
+    assert response.status_code == 201
+    assert response.json['new_stock'] == 15
@@ -0,0 +1,56 @@
+import pytest
+from services import throttle
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(throttle, 'time', fake)
+    return fake
+
+
+def login(client, username, ip='10.0.0.1'):
+    return client.post(
+        '/api/auth/login', json={'username': username, 'password': 'wrong'}, environ_base={'REMOTE_ADDR': ip}
+    )
+
+
+def test_username_bucket_throttles_then_refills(app, client, clock):
+    burst = app.config['LOGIN_THROTTLE_USER_BURST']
+    for _ in range(burst):
+        assert login(client, 'alice').status_code == 401
+
+    response = login(client, 'Alice ')  # same bucket: names are trimmed and lowercased
+    assert response.status_code == 429
+    # Empty bucket: one token takes 60 / LOGIN_THROTTLE_USER_PER_MINUTE seconds
+    retry_after = int(response.headers['Retry-After'])
+    assert retry_after == 60 / app.config['LOGIN_THROTTLE_USER_PER_MINUTE']
+
+    # Other usernames from the same address are unaffected
+    assert login(client, 'bob').status_code == 401
+
+    clock.now += retry_after - 1
+    assert login(client, 'alice').status_code == 429
+    clock.now += 1
+    assert login(client, 'alice').status_code == 401
+    assert login(client, 'alice').status_code == 429
+
+
+def test_ip_bucket_throttles_across_usernames(app, client, auth_headers, clock):
+    burst = app.config['LOGIN_THROTTLE_IP_BURST']
+    for number in range(burst):
+        assert login(client, f'user{number}').status_code == 401
+
+    assert login(client, 'someone-new').status_code == 429
+    assert login(client, 'someone-new', ip='10.0.0.2').status_code == 401
+
+    stats = client.get('/api/auth/throttle-stats', headers=auth_headers).json['throttled']
+    assert stats == {throttle.THROTTLED_COUNTER.format(scope='ip'): 1}
@@ -3,4 +3,4 @@ from app import create_app
 app = create_app('production')
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    app.run()
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import {
   Snackbar,
   Alert,
@@ -6,6 +6,7 @@ import {
   IconButton,
 } from '@mui/material';
 import { Close } from '@mui/icons-material';
+import { useServerEvents } from '../../hooks/useServerEvents';
 
 interface LowStockItem {
   id: number;
@@ -17,26 +18,22 @@ export default function LowStockAlert() {
   const [open, setOpen] = useState(false);
   const [lowStockItems, setLowStockItems] = useState<LowStockItem[]>([]);
 
-  useEffect(() => {
-    // Check for low stock items every minute
-    const checkLowStock = () => {
-      // Mock check - replace with actual API call
-      const items = [
-        { id: 1, name: 'Nike Air Max', stock: 3 },
-        { id: 2, name: 'Puma Suede', stock: 2 },
-      ];
-      
-      if (items.length > 0) {
-        setLowStockItems(items);
-        setOpen(true);
-      }
-    };
-
-    checkLowStock();
-    const interval = setInterval(checkLowStock, 60000); // Check every minute
-    
-    return () => clearInterval(interval);
-  }, []);
+  // Pushed by the backend whenever a sale or stock-in leaves a product low
+  useServerEvents({
+    'low-stock': (data: { product_id: number; name: string; stock: number }) => {
+      setLowStockItems((items) => [
+        ...items.filter((item) => item.id !== data.product_id),
+        { id: data.product_id, name: data.name, stock: data.stock },
+      ]);
+      setOpen(true);
+    },
+    'stock-changed': (data: { product_id: number; stock: number }) => {
+      // Drop items that have been restocked; a low-stock event re-adds them if still low
+      setLowStockItems((items) =>
+        items.filter((item) => item.id !== data.product_id || data.stock <= item.stock)
+      );
+    },
+  });
 
   const handleClose = () => {
     setOpen(false);
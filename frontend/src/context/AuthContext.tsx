@@ -39,6 +39,24 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
     initializeAuth();
   }, []);
 
+  // Renew the access token shortly before it expires using the refresh token,
+  // so tills never fall back to a full password login
+  useEffect(() => {
+    if (!token) return;
+    const expiresAt = authService.getTokenExpiry(token);
+    if (!expiresAt) return;
+
+    const timer = setTimeout(async () => {
+      const newToken = await authService.refresh().catch(() => null);
+      if (newToken) {
+        setToken(newToken);
+      } else {
+        logout();
+      }
+    }, Math.max(expiresAt - Date.now() - 5 * 60 * 1000, 0));
+    return () => clearTimeout(timer);
+  }, [token]);
+
   const initializeAuth = async () => {
     try {
       console.log('🔄 Initializing authentication...');
@@ -72,8 +90,10 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
 
   const clearAuthData = () => {
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     sessionStorage.removeItem('token');
+    sessionStorage.removeItem('refreshToken');
     sessionStorage.removeItem('user');
     setToken(null);
     setUser(null);
@@ -92,6 +112,7 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
       
       // Store in localStorage by default (can be moved to sessionStorage in login page)  
       localStorage.setItem('token', newToken);
+      localStorage.setItem('refreshToken', response.refresh_token);
       localStorage.setItem('user', JSON.stringify(newUser));
       
       setToken(newToken);
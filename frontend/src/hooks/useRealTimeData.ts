@@ -1,8 +1,10 @@
 import { useEffect, useState } from 'react';
+import { useServerEvents } from './useServerEvents';
 
 export function useRealTimeData<T>(
   fetchFunction: () => Promise<T>,
-  interval: number = 30000 // 30 seconds default
+  interval: number = 300000, // fallback poll every 5 minutes; events drive refreshes
+  refreshOn: string[] = ['sale-created', 'stock-changed']
 ) {
   const [data, setData] = useState<T | null>(null);
   const [loading, setLoading] = useState(true);
@@ -20,6 +22,8 @@ export function useRealTimeData<T>(
     }
   };
 
+  useServerEvents(Object.fromEntries(refreshOn.map((type) => [type, () => fetchData()])));
+
   useEffect(() => {
     fetchData();
     const timer = setInterval(fetchData, interval);
@@ -27,4 +31,4 @@ export function useRealTimeData<T>(
   }, [interval]);
 
   return { data, loading, error, refetch: fetchData };
-}
\ No newline at end of file
+}
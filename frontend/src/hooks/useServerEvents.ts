@@ -0,0 +1,39 @@
+import { useEffect, useRef } from 'react';
+
+const EVENTS_URL = 'http://localhost:5000/api/events';
+
+export type ServerEventHandlers = Record<string, (data: any) => void>;
+
+// Subscribes to the backend SSE stream (sale-created, stock-changed, low-stock).
+// EventSource cannot send headers, so the token goes in the query string.
+export function useServerEvents(handlers: ServerEventHandlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  const eventTypes = Object.keys(handlers).sort().join(',');
+
+  useEffect(() => {
+    const token = localStorage.getItem('token') || sessionStorage.getItem('token');
+    if (!token || typeof EventSource === 'undefined') return;
+
+    const source = new EventSource(`${EVENTS_URL}?jwt=${encodeURIComponent(token)}`);
+    const listeners = eventTypes.split(',').filter(Boolean).map((type) => {
+      const listener = (event: MessageEvent) => {
+        try {
+          handlersRef.current[type]?.(JSON.parse(event.data));
+        } catch (error) {
+          console.error(`Failed to handle ${type} event:`, error);
+        }
+      };
+      source.addEventListener(type, listener as EventListener);
+      return { type, listener };
+    });
+
+    return () => {
+      listeners.forEach(({ type, listener }) =>
+        source.removeEventListener(type, listener as EventListener)
+      );
+      source.close();
+    };
+  }, [eventTypes]);
+}
@@ -51,19 +51,24 @@ export default function LoginPage() {
 
       // Store token based on remember me
       const token = localStorage.getItem('token') || sessionStorage.getItem('token');
+      const refreshToken = localStorage.getItem('refreshToken') || sessionStorage.getItem('refreshToken') || '';
       const user = localStorage.getItem('user') || sessionStorage.getItem('user');
       
       if (token && user && !rememberMe) {
         // Move to session storage if not remembering
         sessionStorage.setItem('token', token);
+        sessionStorage.setItem('refreshToken', refreshToken);
         sessionStorage.setItem('user', user);
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         localStorage.removeItem('user');
       } else if (token && user && rememberMe) {
         // Keep in local storage if remembering
         localStorage.setItem('token', token);
+        localStorage.setItem('refreshToken', refreshToken);
         localStorage.setItem('user', user);
         sessionStorage.removeItem('token');
+        sessionStorage.removeItem('refreshToken');
         sessionStorage.removeItem('user');
       }
       
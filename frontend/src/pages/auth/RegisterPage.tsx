@@ -55,6 +55,7 @@ export default function RegisterPage() {
       
       // Automatically log in after registration
       localStorage.setItem('token', response.access_token);
+      localStorage.setItem('refreshToken', response.refresh_token);
       localStorage.setItem('user', JSON.stringify(response.user));
       
       navigate('/dashboard');
@@ -33,6 +33,7 @@ import StatsCard from '../../components/dashboard/StatsCard';
 import LoadingSpinner from '../../components/common/LoadingSpinner';
 import ErrorAlert from '../../components/common/ErrorAlert';
 import { dashboardService, type DashboardStats, type RecentSale, type LowStockProduct } from '../../services/dashboardService';
+import { useServerEvents } from '../../hooks/useServerEvents';
 
 // ✅ FIXED: Helper function to format date and time correctly
 const formatDateTime = (dateString: string): string => {
@@ -97,24 +98,18 @@ export default function DashboardPage() {
       setError('');
       console.log('🔄 Loading dashboard data from API...');
 
-      // ✅ Real API calls instead of mock data
-      const [statsData, recentSalesData, lowStockData] = await Promise.all([
-        dashboardService.getStats(),
-        dashboardService.getRecentSales(),
-        dashboardService.getLowStockProducts()
-      ]);
+      // ✅ One request for every widget
+      const dashboard = await dashboardService.getDashboard();
 
-      console.log('✅ Dashboard stats loaded:', statsData);
-      console.log('✅ Recent sales loaded:', recentSalesData);
-      console.log('✅ Low stock products loaded:', lowStockData);
+      console.log('✅ Dashboard loaded:', dashboard);
 
-      setStats(statsData);
-      setRecentSales(recentSalesData);
-      setLowStockProducts(lowStockData);
-
-      // Generate sales trend based on recent sales data
-      const salesTrendData = generateSalesTrend(recentSalesData);
-      setSalesTrend(salesTrendData);
+      setStats(dashboard.stats);
+      setRecentSales(dashboard.recentSales);
+      setLowStockProducts(dashboard.lowStockProducts);
+      setSalesTrend(dashboard.salesTrend.map((point) => ({
+        day: point.name,
+        sales: point.sales
+      })));
 
     } catch (err: any) {
       console.error('❌ Failed to load dashboard data:', err);
@@ -136,36 +131,16 @@ export default function DashboardPage() {
     }
   };
 
-  // Generate sales trend from recent sales data
-  const generateSalesTrend = (sales: RecentSale[]) => {
-    const last7Days = [];
-    const today = new Date();
-    
-    for (let i = 6; i >= 0; i--) {
-      const date = new Date(today);
-      date.setDate(date.getDate() - i);
-      
-      const dayName = date.toLocaleDateString('en-US', { weekday: 'short' });
-      const dayString = date.toDateString();
-      
-      // Calculate sales for this day
-      const daySales = sales
-        .filter(sale => new Date(sale.created_at).toDateString() === dayString)
-        .reduce((sum, sale) => sum + sale.total_amount, 0);
-      
-      last7Days.push({
-        day: dayName,
-        sales: daySales
-      });
-    }
-    
-    return last7Days;
-  };
+  // Refresh when the backend reports a sale or stock change
+  useServerEvents({
+    'sale-created': () => fetchDashboardData(),
+    'stock-changed': () => fetchDashboardData(),
+  });
 
   useEffect(() => {
     fetchDashboardData();
-    // Auto-refresh every 30 seconds
-    const interval = setInterval(fetchDashboardData, 30000);
+    // Slow fallback refresh in case the event stream is unavailable
+    const interval = setInterval(fetchDashboardData, 300000);
     return () => clearInterval(interval);
   }, []);
 
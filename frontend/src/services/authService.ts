@@ -3,6 +3,7 @@ const BASE_URL = 'http://localhost:5000/api';
 
 export interface LoginResponse {
   access_token: string;
+  refresh_token: string;
   user: {
     id: number;
     username: string;
@@ -27,6 +28,11 @@ function getAuthHeaders(): Record<string, string> {
   };
 }
 
+// The refresh token lives next to the access token (localStorage or sessionStorage)
+function tokenStorage(): Storage {
+  return sessionStorage.getItem('token') ? sessionStorage : localStorage;
+}
+
 export const authService = {
   login: async (username: string, password: string): Promise<LoginResponse> => {
     const response = await fetch(`${BASE_URL}/auth/login`, {
@@ -62,10 +68,39 @@ export const authService = {
     return await response.json();
   },
 
+  // Renew the access token with the stored refresh token (no password check); returns the new token
+  refresh: async (): Promise<string | null> => {
+    const storage = tokenStorage();
+    const refreshToken = storage.getItem('refreshToken');
+    if (!refreshToken) return null;
+
+    const response = await fetch(`${BASE_URL}/auth/refresh`, {
+      method: 'POST',
+      headers: { Authorization: `Bearer ${refreshToken}` },
+    });
+    if (!response.ok) return null;
+
+    const data = await response.json();
+    storage.setItem('token', data.access_token);
+    storage.setItem('refreshToken', data.refresh_token);
+    return data.access_token;
+  },
+
   logout: () => {
+    const refreshToken = tokenStorage().getItem('refreshToken');
+    if (authService.getToken()) {
+      // Revoke both tokens server-side; local state is cleared regardless
+      fetch(`${BASE_URL}/auth/logout`, {
+        method: 'POST',
+        headers: getAuthHeaders(),
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => undefined);
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     sessionStorage.removeItem('token');
+    sessionStorage.removeItem('refreshToken');
     sessionStorage.removeItem('user');
   },
 
@@ -78,6 +113,16 @@ export const authService = {
     return localStorage.getItem('token') || sessionStorage.getItem('token');
   },
 
+  // Milliseconds since epoch when a JWT expires, or null if it cannot be read
+  getTokenExpiry: (token: string): number | null => {
+    try {
+      const payload = JSON.parse(atob(token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/')));
+      return typeof payload.exp === 'number' ? payload.exp * 1000 : null;
+    } catch {
+      return null;
+    }
+  },
+
   isAuthenticated: () => {
     return !!authService.getToken();
   }
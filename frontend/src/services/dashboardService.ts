@@ -24,6 +24,20 @@ export interface LowStockProduct {
   category: string;
 }
 
+export interface SalesTrendPoint {
+  name: string;
+  date: string;
+  sales: number;
+  transactions: number;
+}
+
+export interface DashboardData {
+  stats: DashboardStats;
+  recentSales: RecentSale[];
+  lowStockProducts: LowStockProduct[];
+  salesTrend: SalesTrendPoint[];
+}
+
 function getAuthHeaders(): Record<string, string> {
   const token = localStorage.getItem('token') || sessionStorage.getItem('token');
   return {
@@ -35,6 +49,32 @@ function getAuthHeaders(): Record<string, string> {
 const BASE_URL = 'http://localhost:5000/api';
 
 export const dashboardService = {
+  // All dashboard widgets from the consolidated endpoint in a single request
+  getDashboard: async (): Promise<DashboardData> => {
+    const response = await fetch(`${BASE_URL}/dashboard`, { headers: getAuthHeaders() });
+
+    if (!response.ok) {
+      throw new Error('Failed to load dashboard data');
+    }
+
+    const data = await response.json();
+    const inventory = data.inventory || {};
+    const overview = data.overview || {};
+
+    return {
+      stats: {
+        totalSales: overview.total_sales || 0,
+        totalProducts: inventory.total_products || 0,
+        lowStockCount: inventory.low_stock_count || 0,
+        todaySales: overview.today_sales || 0,
+        inventoryValue: inventory.inventory_value || 0,
+      },
+      recentSales: data.recent_sales || [],
+      lowStockProducts: inventory.low_stock || [],
+      salesTrend: data.sales_trend || [],
+    };
+  },
+
   getStats: async (): Promise<DashboardStats> => {
     // Since your backend doesn't have a specific dashboard endpoint,
     // we'll combine data from multiple endpoints
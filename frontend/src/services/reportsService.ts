@@ -29,6 +29,8 @@ export interface BrandPerformanceData {
 
 export interface MonthlyTrendData {
   month: string;
+  year?: number;
+  period?: string;
   revenue: number;
   profit: number;
   profit_margin: number;
@@ -51,6 +53,66 @@ export interface InventoryAnalysisData {
   totalItems: number;
 }
 
+export type AbcClass = 'A' | 'B' | 'C';
+export type XyzClass = 'X' | 'Y' | 'Z';
+
+export interface ProductClassificationData {
+  product_id: number;
+  name: string;
+  brand: string;
+  category: string;
+  abc_class: AbcClass;
+  xyz_class: XyzClass;
+  revenue: number;
+  revenue_share: number;
+  cumulative_share: number;
+  units_sold: number;
+  demand_cv: number | null;
+  sell_through_rate: number | null;
+  weeks_of_supply: number | null;
+  stock: number;
+  period_start: string;
+  period_end: string;
+  computed_at: string | null;
+}
+
+export interface ClassificationQuery {
+  page?: number;
+  per_page?: number;
+  sort?: 'revenue' | 'units' | 'sell_through' | 'weeks_of_supply' | 'demand_cv';
+  abc?: AbcClass;
+  xyz?: XyzClass;
+  brand?: string;
+  category?: string;
+}
+
+export interface ClassificationPage {
+  items: ProductClassificationData[];
+  total: number;
+  page: number;
+  per_page: number;
+  pages: number;
+}
+
+// Shared analytics filters accepted by the category, brand, product and profit endpoints
+export interface AnalyticsFilters {
+  from?: string; // YYYY-MM-DD
+  to?: string; // YYYY-MM-DD
+  sale_type?: 'retail' | 'wholesale';
+  payment_method?: string;
+  brand?: string;
+  category?: string;
+}
+
+function toQueryString(filters: AnalyticsFilters | ClassificationQuery = {}): string {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value) params.append(key, String(value));
+  });
+  const query = params.toString();
+  return query ? `?${query}` : '';
+}
+
 function getAuthHeaders(): Record<string, string> {
   const token = localStorage.getItem('token') || sessionStorage.getItem('token');
   return {
@@ -142,11 +204,11 @@ export const reportsService = {
     }
   },
 
-  getCategoryAnalysis: async (): Promise<CategoryData[]> => {
+  getCategoryAnalysis: async (filters: AnalyticsFilters = {}): Promise<CategoryData[]> => {
     try {
       console.log('🔄 Reports: Loading REAL category analysis...');
       
-      const response = await fetch(`${SALES_API_URL}/analytics/category-performance`, {
+      const response = await fetch(`${SALES_API_URL}/analytics/category-performance${toQueryString(filters)}`, {
         method: 'GET',
         headers: getAuthHeaders(),
       });
@@ -200,11 +262,11 @@ export const reportsService = {
     }
   },
 
-  getBrandPerformance: async (): Promise<BrandPerformanceData[]> => {
+  getBrandPerformance: async (filters: AnalyticsFilters = {}): Promise<BrandPerformanceData[]> => {
     try {
       console.log('🔄 Reports: Loading REAL brand performance...');
       
-      const response = await fetch(`${SALES_API_URL}/analytics/brand-performance`, {
+      const response = await fetch(`${SALES_API_URL}/analytics/brand-performance${toQueryString(filters)}`, {
         method: 'GET',
         headers: getAuthHeaders(),
       });
@@ -224,11 +286,11 @@ export const reportsService = {
     }
   },
 
-  getTopProducts: async (): Promise<TopProductData[]> => {
+  getTopProducts: async (filters: AnalyticsFilters = {}): Promise<TopProductData[]> => {
     try {
       console.log('🔄 Reports: Loading REAL top products with profit...');
       
-      const response = await fetch(`${SALES_API_URL}/analytics/product-performance`, {
+      const response = await fetch(`${SALES_API_URL}/analytics/product-performance${toQueryString(filters)}`, {
         method: 'GET',
         headers: getAuthHeaders(),
       });
@@ -263,11 +325,11 @@ export const reportsService = {
     }
   },
 
-  getMonthlyTrend: async (): Promise<MonthlyTrendData[]> => {
+  getMonthlyTrend: async (months: number = 6): Promise<MonthlyTrendData[]> => {
     try {
       console.log('🔄 Reports: Loading REAL monthly trend with profit...');
       
-      const response = await fetch(`${SALES_API_URL}/analytics/monthly-trend`, {
+      const response = await fetch(`${SALES_API_URL}/analytics/monthly-trend?months=${months}`, {
         method: 'GET',
         headers: getAuthHeaders(),
       });
@@ -349,11 +411,11 @@ export const reportsService = {
     }
   },
 
-  getProfitSummary: async () => {
+  getProfitSummary: async (filters: AnalyticsFilters = {}) => {
     try {
       console.log('🔄 Reports: Loading profit summary...');
       
-      const response = await fetch(`${SALES_API_URL}/analytics/profit-summary`, {
+      const response = await fetch(`${SALES_API_URL}/analytics/profit-summary${toQueryString(filters)}`, {
         method: 'GET',
         headers: getAuthHeaders(),
       });
@@ -372,4 +434,48 @@ export const reportsService = {
       return null;
     }
   },
-};
\ No newline at end of file
+
+  // Stored ABC/XYZ classification, paged and filtered server-side
+  getProductClassification: async (query: ClassificationQuery = {}): Promise<ClassificationPage> => {
+    const empty = { items: [], total: 0, page: query.page || 1, per_page: query.per_page || 50, pages: 0 };
+    try {
+      console.log('🔄 Reports: Loading product classification...');
+      
+      const response = await fetch(`${SALES_API_URL}/analytics/classification${toQueryString(query)}`, {
+        method: 'GET',
+        headers: getAuthHeaders(),
+      });
+
+      if (response.ok) {
+        const data = await response.json();
+        if (data.success) {
+          return {
+            items: data.items,
+            total: data.total,
+            page: data.page,
+            per_page: data.per_page,
+            pages: data.pages,
+          };
+        }
+      }
+      
+      return empty;
+    } catch (error) {
+      console.error('❌ Reports: Failed to load product classification:', error);
+      return empty;
+    }
+  },
+
+  refreshProductClassification: async (weeks: number = 13): Promise<boolean> => {
+    try {
+      const response = await fetch(`${SALES_API_URL}/analytics/classification/refresh?weeks=${weeks}`, {
+        method: 'POST',
+        headers: getAuthHeaders(),
+      });
+      return response.ok;
+    } catch (error) {
+      console.error('❌ Reports: Failed to refresh product classification:', error);
+      return false;
+    }
+  },
+};